@@ -6,6 +6,8 @@ from .models import (
     Booking, BookingReview, BookingMessage, 
     DaycareAvailability, BookingPayment, DaycarePricing
 )
+from .ratings import refresh_daycare_rating
+from .listing_cache import mark_daycare_stale, mark_listing_stale
 
 @admin.register(DaycarePricing)
 class DaycarePricingAdmin(admin.ModelAdmin):
@@ -144,7 +146,13 @@ class BookingReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'feature_reviews', 'unffeature_reviews']
     
     def approve_reviews(self, request, queryset):
+        # queryset.update() skips post_save, so refresh the daycare aggregates here
+        daycare_ids = set(queryset.values_list('daycare_id', flat=True))
         queryset.update(is_approved=True)
+        for daycare_id in daycare_ids:
+            refresh_daycare_rating(daycare_id)
+            mark_daycare_stale(daycare_id)
+        mark_listing_stale()
     approve_reviews.short_description = "Approve selected reviews"
     
     def feature_reviews(self, request, queryset):
@@ -0,0 +1,198 @@
+"""
+Booking analytics for the daycare and parent history dashboards.
+
+``daycare_history`` answers in four queries however many bookings the
+daycare has: the booking rows with their review joined in, a calendar-month
+``TruncMonth`` grouping of the daily rollups (booking.rollups), the most
+frequent parents, and one aggregate for children served and average stay
+(computed in the database from ``end_date - start_date``). Results are
+cached per daycare, per day and per requested range, under a per-daycare
+version counter that booking and review changes bump (see signals.py).
+Without a range the booking list and totals are all-time and only the
+monthly summary falls back to the last ``DEFAULT_MONTHS`` months.
+``parent_history`` does the same for a parent, uncached. ``parent_stats``
+(the parent home page counters) is one conditional aggregate, cached per
+parent and day under a per-parent version that every write to one of the
+parent's bookings bumps.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .caching import bump_version, get_version
+from .models import Booking, DaycareDailyStats, ParentDailyStats
+
+CACHE_PREFIX = 'booking:daycare-history:'
+VERSION_PREFIX = 'daycare-history:'
+STATS_CACHE_PREFIX = 'booking:parent-stats:'
+STATS_VERSION_PREFIX = 'parent-stats:'
+CACHE_TIMEOUT = 24 * 60 * 60
+# Months covered when no range is given, the current one included
+DEFAULT_MONTHS = 6
+FREQUENT_PARENT_COUNT = 5
+FAVORITE_DAYCARE_COUNT = 5
+
+
+def month_start(day, months_back=0):
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _months(start, end):
+    months = []
+    current = month_start(start)
+    while current <= end:
+        months.append(current)
+        current = month_start(current, -1)
+    return months
+
+
+def _monthly(rollups, start, end, amount_key):
+    """Bookings and revenue per calendar month from daily rollup rows, zero-filled."""
+    by_month = {
+        row['month']: row
+        for row in rollups.filter(date__gte=start, date__lte=end).annotate(
+            month=TruncMonth('date')
+        ).order_by().values('month').annotate(count=Sum('bookings'), amount=Sum('revenue'))
+    }
+    return [
+        {
+            'month': month.strftime('%B %Y'),
+            'bookings': by_month[month]['count'] if month in by_month else 0,
+            amount_key: by_month[month]['amount'] if month in by_month else 0,
+        }
+        for month in _months(start, end)
+    ]
+
+
+def _totals(bookings):
+    """(distinct children, average stay in days) over ``bookings``, in one query."""
+    totals = bookings.aggregate(
+        children=Count('child', distinct=True),
+        # NULL end dates drop out of the average
+        avg_stay=Avg(ExpressionWrapper(F('end_date') - F('start_date'), output_field=DurationField())),
+    )
+    # Booking.duration_days counts both the first and the last day
+    average = round(totals['avg_stay'].total_seconds() / 86400 + 1, 1) if totals['avg_stay'] else 0
+    return totals['children'], average
+
+
+def _build(daycare_id, start, end, today):
+    bookings = Booking.objects.filter(daycare_id=daycare_id)
+    # Plain datetime bounds keep the (daycare, created_at) index usable
+    if start:
+        bookings = bookings.filter(created_at__gte=datetime.combine(start, time.min))
+    if end:
+        bookings = bookings.filter(created_at__lt=datetime.combine(end + timedelta(days=1), time.min))
+
+    history = [
+        {
+            'id': row['id'],
+            'parent_name': row['parent__full_name'] or '',
+            'child_name': row['child__full_name'] or '',
+            'date': row['start_date'].strftime('%Y-%m-%d') if row['start_date'] else '',
+            'rating': row['review__rating'] or 0,
+            'review': row['review__comment'] or '',
+        }
+        for row in bookings.values(
+            'id', 'parent__full_name', 'child__full_name', 'start_date', 'review__rating', 'review__comment'
+        )
+    ]
+
+    default_start, default_end = default_range(today)
+    monthly_summary = _monthly(
+        DaycareDailyStats.objects.filter(daycare_id=daycare_id),
+        start or default_start, end or default_end, 'amount_earned'
+    )
+
+    frequent_parents = list(
+        bookings.values('parent__full_name', 'parent__id').annotate(
+            booking_count=Count('id')
+        ).order_by('-booking_count')[:FREQUENT_PARENT_COUNT]
+    )
+
+    children, average_duration = _totals(bookings)
+
+    return {
+        'range': {'from': start and start.isoformat(), 'to': end and end.isoformat()},
+        'booking_history': history,
+        'monthly_summary': monthly_summary,
+        'frequent_parents': frequent_parents,
+        'total_children_served': children,
+        'average_booking_duration': average_duration,
+    }
+
+
+def default_range(today=None):
+    today = today or timezone.now().date()
+    return month_start(today, DEFAULT_MONTHS - 1), today
+
+
+def daycare_history(daycare_id, start=None, end=None):
+    """Dashboard payload for bookings created in [start, end]; either bound may be None (open)."""
+    today = timezone.now().date()
+    version = get_version(f'{VERSION_PREFIX}{daycare_id}')
+    bounds = ':'.join(day.isoformat() if day else '' for day in (start, end))
+    key = f'{CACHE_PREFIX}{daycare_id}:{version}:{today.isoformat()}:{bounds}'
+    data = cache.get(key)
+    if data is None:
+        data = _build(daycare_id, start, end, today)
+        cache.set(key, data, timeout=CACHE_TIMEOUT)
+    return data
+
+
+def mark_history_stale(daycare_id):
+    bump_version(f'{VERSION_PREFIX}{daycare_id}')
+
+
+def parent_history(parent_id):
+    """Summary for the parent's booking history page over the last DEFAULT_MONTHS months."""
+    start, end = default_range()
+    # Distinct children, average stay and per-daycare counts don't add up
+    # across daily rollup rows, so these read the parent's own bookings
+    # (one parent's history, through the (parent, created_at) index)
+    bookings = Booking.objects.filter(parent_id=parent_id)
+    children, average_duration = _totals(bookings)
+    return {
+        'monthly_summary': _monthly(ParentDailyStats.objects.filter(parent_id=parent_id), start, end, 'amount_spent'),
+        'favorite_daycares': list(
+            bookings.values('daycare__name', 'daycare__id').annotate(
+                booking_count=Count('id')
+            ).order_by('-booking_count')[:FAVORITE_DAYCARE_COUNT]
+        ),
+        'total_children_enrolled': children,
+        'average_booking_duration': average_duration,
+    }
+
+
+def _parent_stats(parent_id, today):
+    stats = Booking.objects.filter(parent_id=parent_id).aggregate(
+        total_bookings=Count('id'),
+        active_bookings=Count('id', filter=Q(status__in=['confirmed', 'active'])),
+        completed_bookings=Count('id', filter=Q(status='completed')),
+        cancelled_bookings=Count('id', filter=Q(status='cancelled')),
+        total_spent=Sum('paid_amount', filter=Q(status__in=['completed', 'active'])),
+        upcoming_bookings=Count('id', filter=Q(status__in=['pending', 'confirmed'], start_date__gte=today)),
+    )
+    stats['total_spent'] = stats['total_spent'] or 0
+    return stats
+
+
+def parent_stats(parent_id):
+    """Booking counters for the parent home page, in one query."""
+    today = timezone.now().date()
+    version = get_version(f'{STATS_VERSION_PREFIX}{parent_id}')
+    # The day is part of the key because "upcoming" depends on it
+    key = f'{STATS_CACHE_PREFIX}{parent_id}:{version}:{today.isoformat()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = _parent_stats(parent_id, today)
+        cache.set(key, stats, timeout=CACHE_TIMEOUT)
+    return stats
+
+
+def mark_parent_stats_stale(parent_id):
+    bump_version(f'{STATS_VERSION_PREFIX}{parent_id}')
@@ -7,5 +7,4 @@ class BookingConfig(AppConfig):
     verbose_name = 'Booking Management'
     
     def ready(self):
-        # Import signals here if needed in the future
-        pass
\ No newline at end of file
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+In-memory autocomplete for the daycare search box.
+
+Suggestions (verified daycare names, areas and service tags) live in a
+per-process ``AutocompleteIndex``: a character trie over every word of every
+label answers prefix queries, and a trigram index catches typos when the
+prefix lookup comes up short. Neither touches the database at query time.
+
+Daycare saves update the local index in place and bump ``VERSION_NAME``;
+other processes see the new version on their next lookup and rebuild. A
+full rebuild also happens every ``REBUILD_SECONDS`` to pick up drift the
+incremental path ignores (area and tag counts, tags nobody uses any more).
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from django.db.models import Count
+
+from users.models import AREA_CHOICES, ServiceTag
+from .caching import ProcessLocal
+from .queries import verified_daycares
+
+VERSION_NAME = 'autocomplete'
+REBUILD_SECONDS = 60 * 60
+# Queries shorter than this never fall back to fuzzy matching
+MIN_FUZZY_LENGTH = 3
+MIN_SIMILARITY = 0.3
+
+_WORD_SPLIT = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase ASCII with punctuation collapsed to single spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    return ' '.join(_WORD_SPLIT.split(text)).strip()
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Suggestion:
+    __slots__ = ('kind', 'value', 'label', 'weight', 'words', 'trigrams')
+
+    def __init__(self, kind, value, label, weight=0):
+        self.kind = kind
+        self.value = value
+        self.label = label
+        self.weight = weight
+        self.words = normalize(label).split()
+        self.trigrams = set().union(*(trigrams(word) for word in self.words)) if self.words else set()
+
+    @property
+    def key(self):
+        return (self.kind, self.value)
+
+    def as_dict(self):
+        return {'type': self.kind, 'value': self.value, 'label': self.label}
+
+
+class AutocompleteIndex:
+    """Prefix trie plus trigram index over Suggestions, keyed by (kind, value)."""
+
+    def __init__(self):
+        self.entries = {}
+        self.trie = {}  # char -> child node; the '' key holds keys of entries under this prefix
+        self.by_trigram = {}
+        self.lock = threading.Lock()
+
+    def add(self, suggestion):
+        with self.lock:
+            self._discard(suggestion.key)
+            self.entries[suggestion.key] = suggestion
+            for word in suggestion.words:
+                node = self.trie
+                for char in word:
+                    node = node.setdefault(char, {'': set()})
+                    node[''].add(suggestion.key)
+            for gram in suggestion.trigrams:
+                self.by_trigram.setdefault(gram, set()).add(suggestion.key)
+
+    def remove(self, key):
+        with self.lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        suggestion = self.entries.pop(key, None)
+        if suggestion is None:
+            return
+        for word in suggestion.words:
+            node = self.trie
+            for char in word:
+                node = node.get(char)
+                if node is None:
+                    break
+                node[''].discard(key)
+        for gram in suggestion.trigrams:
+            keys = self.by_trigram.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_trigram[gram]
+
+    def search(self, query, limit=8):
+        """Up to ``limit`` Suggestions: prefix matches first, then fuzzy ones."""
+        words = normalize(query).split()
+        if not words:
+            return []
+        with self.lock:
+            matches = self._prefix_keys(words)
+            ranked = heapq.nlargest(limit, matches, key=lambda key: self._rank(key, words))
+            if len(ranked) < limit and len(' '.join(words)) >= MIN_FUZZY_LENGTH:
+                for key in self._fuzzy_keys(words, limit):
+                    if key not in matches:
+                        ranked.append(key)
+                    if len(ranked) == limit:
+                        break
+            return [self.entries[key] for key in ranked]
+
+    def _prefix_keys(self, words):
+        """Keys with a word starting with each query word."""
+        result = None
+        for word in words:
+            node = self.trie
+            for char in word:
+                node = node.get(char)
+                if node is None:
+                    return set()
+            result = set(node['']) if result is None else result & node['']
+            if not result:
+                break
+        return result
+
+    def _rank(self, key, words):
+        suggestion = self.entries[key]
+        # Labels that start with the query beat mid-label word matches
+        starts = ' '.join(suggestion.words).startswith(' '.join(words))
+        return (starts, suggestion.weight, -len(suggestion.label))
+
+    def _fuzzy_keys(self, words, limit):
+        query_grams = set().union(*(trigrams(word) for word in words))
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.by_trigram.get(gram, ()))
+        scored = []
+        for key, count in shared.items():
+            suggestion = self.entries[key]
+            similarity = count / len(query_grams | suggestion.trigrams)
+            if similarity >= MIN_SIMILARITY:
+                scored.append((similarity, suggestion.weight, key))
+        return [key for _, _, key in heapq.nlargest(limit, scored)]
+
+
+def daycare_suggestion(daycare_id, name, review_count):
+    return Suggestion('daycare', daycare_id, name, review_count)
+
+
+def build_index():
+    index = AutocompleteIndex()
+    daycares = verified_daycares().prefetch_related(None).values_list('id', 'name', 'review_count', 'area')
+    area_counts = Counter()
+    for daycare_id, name, review_count, area in daycares:
+        index.add(daycare_suggestion(daycare_id, name, review_count))
+        area_counts[area] += 1
+    for code, label in AREA_CHOICES:
+        index.add(Suggestion('area', code, label, area_counts[code]))
+    tags = ServiceTag.objects.annotate(daycare_count=Count('daycare_links')).filter(daycare_count__gt=0)
+    for tag in tags:
+        index.add(Suggestion('service', tag.slug, tag.name, tag.daycare_count))
+    return index
+
+
+_index = ProcessLocal(VERSION_NAME, build_index, REBUILD_SECONDS)
+
+
+def get_index():
+    """This process's index, rebuilt when another process changed the data or it has aged out."""
+    return _index.get()
+
+
+def suggest(query, limit=8):
+    return [suggestion.as_dict() for suggestion in get_index().search(query, limit)]
+
+
+def update_daycare(daycare_id):
+    """Re-index one daycare (dropping it if it is no longer verified) and its tags."""
+    row = verified_daycares().prefetch_related(None).filter(pk=daycare_id).values_list(
+        'name', 'review_count'
+    ).first()
+    tags = list(ServiceTag.objects.filter(daycare_links__daycare_id=daycare_id)) if row else []
+
+    def change(index):
+        if row is None:
+            index.remove(('daycare', daycare_id))
+            return
+        index.add(daycare_suggestion(daycare_id, *row))
+        for tag in tags:
+            if ('service', tag.slug) not in index.entries:
+                index.add(Suggestion('service', tag.slug, tag.name, 1))
+
+    _index.apply(change)
+
+
+def remove_daycare(daycare_id):
+    _index.apply(lambda index: index.remove(('daycare', daycare_id)))
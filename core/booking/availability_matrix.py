@@ -0,0 +1,122 @@
+"""
+In-memory remaining-capacity matrix for date-range availability search.
+
+Each process holds a NumPy array with one row per verified daycare and one
+column per day of a rolling ``HORIZON_DAYS`` window starting today; a cell
+is the number of places still free that day. It is loaded from
+DaycareAvailability (weekday capacities, closed days = 0) overlaid with the
+DaycareOccupancy ledger, which counts the places bookings hold.
+
+"Free on every weekday from X to Y" is then a column slice and a min
+reduction over all daycares at once. Ledger writes (booking create, cancel,
+decline) patch this process's matrix after commit and bump
+``VERSION_NAME`` so other processes reload theirs; so do availability
+changes and daycares joining or leaving the verified set. The matrix is
+also rebuilt when the date rolls over.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .caching import ProcessLocal
+from .models import DaycareAvailability, DaycareOccupancy
+from .queries import verified_daycares
+
+VERSION_NAME = 'availability-matrix'
+HORIZON_DAYS = 120
+REBUILD_SECONDS = 60 * 60
+DEFAULT_CAPACITY = DaycareAvailability._meta.get_field('max_capacity').default
+WEEKDAYS = [day for day, _ in DaycareAvailability.DAY_CHOICES]  # Monday first, like date.weekday()
+
+
+class OutsideHorizon(ValueError):
+    pass
+
+
+class CapacityMatrix:
+
+    def __init__(self, origin, daycare_ids, remaining):
+        self.origin = origin
+        self.daycare_ids = np.asarray(daycare_ids, dtype=np.int64)
+        self.row_of = {daycare_id: row for row, daycare_id in enumerate(daycare_ids)}
+        self.remaining = remaining
+        # weekday (0 = Monday) of every column, for weekday-only queries
+        self.column_weekdays = (np.arange(remaining.shape[1]) + origin.weekday()) % 7
+
+    def columns(self, start_date, end_date):
+        """Column slice for the inclusive range, clipped to start today."""
+        first = max((start_date - self.origin).days, 0)
+        last = (end_date - self.origin).days
+        if last < first:
+            # Clipping would otherwise turn a past range into an empty (all-available) one
+            raise OutsideHorizon("Availability can't be searched for past dates.")
+        if last >= self.remaining.shape[1]:
+            raise OutsideHorizon(
+                f"Availability can only be searched up to {self.origin + timedelta(days=self.remaining.shape[1] - 1)}."
+            )
+        return slice(first, last + 1)
+
+    def available(self, start_date, end_date, weekdays_only=True, min_slots=1):
+        """Ids of daycares with at least ``min_slots`` free places on every (week)day in the range."""
+        span = self.columns(start_date, end_date)
+        window = self.remaining[:, span]
+        if weekdays_only:
+            window = window[:, self.column_weekdays[span] < 5]
+        if window.shape[1] == 0:
+            return self.daycare_ids.tolist()
+        return self.daycare_ids[window.min(axis=1) >= min_slots].tolist()
+
+    def adjust(self, daycare_id, dates, delta):
+        row = self.row_of.get(daycare_id)
+        if row is None:
+            return
+        cols = [(day - self.origin).days for day in dates]
+        cols = [col for col in cols if 0 <= col < self.remaining.shape[1]]
+        if cols:
+            self.remaining[row, cols] = np.maximum(self.remaining[row, cols] + delta, 0)
+
+
+def build_matrix():
+    origin = timezone.now().date()
+    daycare_ids = list(verified_daycares().prefetch_related(None).order_by('id').values_list('id', flat=True))
+    row_of = {daycare_id: row for row, daycare_id in enumerate(daycare_ids)}
+
+    weekly = np.full((len(daycare_ids), 7), DEFAULT_CAPACITY, dtype=np.int32)
+    for daycare_id, day_of_week, max_capacity, is_available in DaycareAvailability.objects.filter(
+        daycare_id__in=daycare_ids
+    ).values_list('daycare_id', 'day_of_week', 'max_capacity', 'is_available'):
+        weekly[row_of[daycare_id], WEEKDAYS.index(day_of_week)] = max_capacity if is_available else 0
+
+    column_weekdays = (np.arange(HORIZON_DAYS) + origin.weekday()) % 7
+    remaining = weekly[:, column_weekdays]
+
+    ledger = DaycareOccupancy.objects.filter(
+        daycare_id__in=daycare_ids,
+        date__gte=origin,
+        date__lt=origin + timedelta(days=HORIZON_DAYS),
+    ).values_list('daycare_id', 'date', 'capacity', 'used')
+    for daycare_id, day, capacity, used in ledger.iterator():
+        remaining[row_of[daycare_id], (day - origin).days] = capacity - used
+
+    return CapacityMatrix(origin, daycare_ids, np.maximum(remaining, 0))
+
+
+_matrix = ProcessLocal(VERSION_NAME, build_matrix, REBUILD_SECONDS, scope=lambda: timezone.now().date())
+
+
+def get_matrix():
+    return _matrix.get()
+
+
+def available_daycare_ids(start_date, end_date, weekdays_only=True, min_slots=1):
+    return get_matrix().available(start_date, end_date, weekdays_only, min_slots)
+
+
+def record_places(daycare_id, dates, delta):
+    """Apply a committed ledger change (``delta`` places free per date) to the matrix."""
+    _matrix.apply(lambda matrix: matrix.adjust(daycare_id, dates, delta))
+
+
+def mark_matrix_stale():
+    _matrix.invalidate()
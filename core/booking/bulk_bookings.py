@@ -0,0 +1,192 @@
+"""
+Creating many bookings in one request.
+
+``create_bookings`` checks a whole batch with a fixed number of queries,
+however many entries it holds: one lookup each for the daycares, children
+and emergency contacts named, one for the price summaries, one overlap
+query across every child in the batch (entries are also checked against
+each other) and one ``occupancy.reserve_many`` call for the places. The
+bookings are then written with a single ``bulk_create``, all inside one
+transaction that holds the children's row locks, like the single-booking
+path in BookingCreateSerializer.
+
+In atomic mode (the default) any failing entry means nothing is written;
+in best-effort mode the entries that pass are created and the others are
+reported back. Results are per entry, in request order. If a day fills
+up concurrently while places are being taken, an atomic batch fails as a
+whole; a best-effort batch re-reads the ledger once to find the entries
+that still fit.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from users.models import Child, DaycareCenter, EmergencyContact
+from .analytics import mark_history_stale, mark_parent_stats_stale
+from .leaderboard import mark_leaderboard_stale
+from .models import Booking, DaycarePriceSummary
+from .occupancy import HOLDING_STATUSES, CapacityError, reserve_many
+from .rollups import refresh_bookings
+from .serializers import BookingBulkItemSerializer, BookingCreateSerializer
+
+ATOMIC = 'atomic'
+BEST_EFFORT = 'best_effort'
+MODES = (ATOMIC, BEST_EFFORT)
+
+
+def _error(message, **extra):
+    return {'non_field_errors': [message], **extra}
+
+
+def _check_references(parent, entries, errors):
+    """Resolve the ids in each entry to objects, recording ownership and verification errors."""
+    daycares = DaycareCenter.objects.select_related('user').in_bulk(
+        {data['daycare'] for data in entries.values()}
+    )
+    children = Child.objects.filter(parent=parent).only('id', 'parent').in_bulk(
+        {data['child'] for data in entries.values()}
+    )
+    contacts = EmergencyContact.objects.filter(parent=parent).only('id', 'parent').in_bulk(
+        {data['emergency_contact'] for data in entries.values()}
+    )
+    for index, data in list(entries.items()):
+        daycare = daycares.get(data['daycare'])
+        if daycare is None:
+            errors[index] = {'daycare': [f"Invalid pk \"{data['daycare']}\" - object does not exist."]}
+        elif data['child'] not in children:
+            errors[index] = _error("Child does not belong to this parent.")
+        elif data['emergency_contact'] not in contacts:
+            errors[index] = _error("Emergency contact does not belong to this parent.")
+        elif not daycare.user.is_verified:
+            errors[index] = _error("This daycare is not verified yet.")
+        else:
+            data['daycare'] = daycare
+            data['child'] = children[data['child']]
+            data['emergency_contact'] = contacts[data['emergency_contact']]
+            continue
+        del entries[index]
+
+
+def _check_overlaps(entries, errors):
+    """Reject entries overlapping a held booking or an earlier entry for the same child."""
+    held = defaultdict(list)
+    overlapping = Booking.objects.filter(
+        child_id__in={data['child'].id for data in entries.values()},
+        status__in=HOLDING_STATUSES,
+        start_date__lte=max(data['end_date'] for data in entries.values()),
+        end_date__gte=min(data['start_date'] for data in entries.values()),
+    ).values_list('child_id', 'start_date', 'end_date')
+    for child_id, start_date, end_date in overlapping:
+        held[child_id].append((start_date, end_date))
+    for index, data in list(entries.items()):
+        periods = held[data['child'].id]
+        if any(start <= data['end_date'] and end >= data['start_date'] for start, end in periods):
+            errors[index] = _error("Child already has a booking during this period.")
+            del entries[index]
+        else:
+            periods.append((data['start_date'], data['end_date']))
+
+
+def _prices(entries):
+    """{(daycare id, booking type): amount} from the cheapest active tier, or the default rate."""
+    summaries = dict(
+        ((daycare_id, frequency.lower()), min_price)
+        for daycare_id, frequency, min_price in DaycarePriceSummary.objects.filter(
+            daycare_id__in={data['daycare'].id for data in entries.values()},
+            frequency__in={data['booking_type'].capitalize() for data in entries.values()},
+        ).values_list('daycare_id', 'frequency', 'min_price')
+    )
+    return {
+        key: summaries.get(key, BookingCreateSerializer.DEFAULT_RATES.get(key[1], 8000))
+        for key in {(data['daycare'].id, data['booking_type']) for data in entries.values()}
+    }
+
+
+def _reserve(stays, mode):
+    """reserve_many's per-stay results, failing the stays rather than raising on a concurrent fill."""
+    attempts = 2 if mode == BEST_EFFORT else 1
+    for _ in range(attempts):
+        try:
+            return reserve_many(stays, partial=mode == BEST_EFFORT)
+        except CapacityError as exc:
+            error = exc
+    return [error] * len(stays), [[] for _ in stays]
+
+
+def create_bookings(parent, items, mode=ATOMIC):
+    """
+    Validate and create ``items`` (booking payloads) for ``parent``.
+
+    Returns one dict per item: ``{'index', 'status': 'created', 'booking_id'}``,
+    ``{'index', 'status': 'failed', 'errors'}``, or in atomic mode
+    ``{'index', 'status': 'skipped'}`` for valid items left out because
+    another one failed.
+    """
+    errors = {}
+    entries = {}
+    for index, item in enumerate(items):
+        serializer = BookingBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            entries[index] = dict(serializer.validated_data)
+        else:
+            errors[index] = serializer.errors
+
+    def proceed():
+        # Atomic batches stop at the first stage that rejects an entry
+        return entries and not (errors and mode == ATOMIC)
+
+    created = {}
+    if proceed():
+        _check_references(parent, entries, errors)
+    if proceed():
+        prices = _prices(entries)
+        with transaction.atomic():
+            # Same per-child serialisation as the single-booking path
+            list(Child.objects.select_for_update().filter(
+                pk__in={data['child'].id for data in entries.values()}
+            ).values_list('id', flat=True))
+            _check_overlaps(entries, errors)
+            if proceed():
+                indexes = list(entries)
+                outcomes, closed = _reserve(
+                    [(entries[i]['daycare'].id, entries[i]['start_date'], entries[i]['end_date']) for i in indexes],
+                    mode,
+                )
+                for index, error, closed_dates in zip(indexes, outcomes, closed):
+                    if error is not None:
+                        errors[index] = _error(str(error), full_dates=[day.isoformat() for day in error.full_dates])
+                        del entries[index]
+                    else:
+                        entries[index]['closed_dates'] = closed_dates
+            if proceed():
+                bookings = Booking.objects.bulk_create([
+                    Booking(
+                        parent=parent,
+                        total_amount=prices[data['daycare'].id, data['booking_type']],
+                        **data
+                    )
+                    for data in entries.values()
+                ])
+                created = dict(zip(entries, bookings))
+                refresh_bookings(bookings)
+        if created:
+            # bulk_create sends no post_save, so do what booking_saved would
+            daycare_ids = {booking.daycare_id for booking in created.values()}
+
+            def mark_stale():
+                mark_leaderboard_stale()
+                for daycare_id in daycare_ids:
+                    mark_history_stale(daycare_id)
+                mark_parent_stats_stale(parent.id)
+
+            transaction.on_commit(mark_stale)
+
+    results = []
+    for index in range(len(items)):
+        if index in created:
+            results.append({'index': index, 'status': 'created', 'booking_id': created[index].id})
+        elif index in errors:
+            results.append({'index': index, 'status': 'failed', 'errors': errors[index]})
+        else:
+            results.append({'index': index, 'status': 'skipped'})
+    return results
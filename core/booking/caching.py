@@ -0,0 +1,144 @@
+"""
+Cache helpers shared by the read-heavy booking endpoints.
+
+* Version counters: writers call ``bump_version(name)``; readers fold
+  ``get_version(name)`` into their cache keys or freshness checks, so an
+  invalidation is a single cache increment and never a key scan.
+* ``single_flight``: serve a cached value, letting exactly one caller (per
+  cache, so across processes with a shared backend) rebuild it when it goes
+  stale while everyone else keeps getting the previous value.
+* ``ProcessLocal``: a structure built once per process (an index, a
+  matrix) that follows a version counter: local writers patch it in place,
+  other processes notice the bump and rebuild theirs.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+VERSION_PREFIX = 'booking:version:'
+LOCK_SUFFIX = ':rebuilding'
+
+
+def get_version(name):
+    return cache.get(VERSION_PREFIX + name, 0)
+
+
+def get_versions(*names):
+    values = cache.get_many([VERSION_PREFIX + name for name in names])
+    return tuple(values.get(VERSION_PREFIX + name, 0) for name in names)
+
+
+def bump_version(name):
+    key = VERSION_PREFIX + name
+    if cache.add(key, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); any fresh value invalidates readers
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def single_flight(key, builder, max_age, version_name=None, min_rebuild_interval=0,
+                  lock_timeout=30, cold_wait=5.0):
+    """
+    Return ``builder()``'s result cached under ``key``.
+
+    The cached entry is stale once it is older than ``max_age`` seconds, or
+    when ``version_name`` has been bumped since it was built (but no sooner
+    than ``min_rebuild_interval`` seconds after the last build, so a burst
+    of writes doesn't turn into a burst of rebuilds). Stale entries are
+    rebuilt by whichever caller wins a cache.add() lock; the rest return
+    the stale value. With nothing cached yet, losers wait up to
+    ``cold_wait`` seconds for the winner before building it themselves.
+    """
+    version = get_version(version_name) if version_name else None
+    entry = cache.get(key)
+    if entry is not None:
+        age = time.time() - entry['built_at']
+        outdated = entry['version'] != version and age >= min_rebuild_interval
+        if age < max_age and not outdated:
+            return entry['value']
+
+    lock_key = key + LOCK_SUFFIX
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        try:
+            value = builder()
+            cache.set(key, {'value': value, 'built_at': time.time(), 'version': version}, timeout=None)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+
+    deadline = time.time() + cold_wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return builder()
+
+
+class ProcessLocal:
+    """
+    Lazily built per-process value tied to the ``version_name`` counter.
+
+    ``get()`` rebuilds it with ``build()`` when the counter has moved (some
+    other process changed the data), after ``max_age`` seconds, or when
+    ``scope()`` (e.g. today's date) changes. ``apply(change)`` patches this
+    process's copy in place and bumps the counter; if this copy had already
+    missed another change it is dropped instead and rebuilt on next use.
+    """
+
+    def __init__(self, version_name, build, max_age, scope=None):
+        self.version_name = version_name
+        self.build = build
+        self.max_age = max_age
+        self.scope = scope or (lambda: None)
+        self.lock = threading.Lock()
+        self.value = None
+        self.version = None
+        self.built_at = 0.0
+        self.built_scope = None
+
+    def _is_fresh(self, version):
+        return (
+            self.value is not None
+            and self.version == version
+            and time.time() - self.built_at <= self.max_age
+            and self.built_scope == self.scope()
+        )
+
+    def get(self):
+        version = get_version(self.version_name)
+        if not self._is_fresh(version):
+            with self.lock:
+                if not self._is_fresh(version):
+                    self.built_scope = self.scope()
+                    self.value = self.build()
+                    self.version = version
+                    self.built_at = time.time()
+        return self.value
+
+    def apply(self, change):
+        """Run ``change(value)`` on this process's copy and publish a new version."""
+        previous = get_version(self.version_name)
+        version = bump_version(self.version_name)
+        with self.lock:
+            if self.value is None:
+                return
+            if self.version == previous and version == previous + 1:
+                change(self.value)
+                self.version = version
+            else:
+                self.value = None
+
+    def invalidate(self):
+        """Force every process, this one included, to rebuild on next use."""
+        bump_version(self.version_name)
+        with self.lock:
+            self.value = None
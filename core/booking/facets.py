@@ -0,0 +1,116 @@
+"""
+Facet counts for daycare search results.
+
+Area, rating-band and price-band counts come from one conditional
+aggregation over the filtered search queryset; per-service counts are a
+second, GROUP BY tag query over the same queryset (tags come from
+free-text input, so one aggregate column per tag would have no upper
+bound), cut to the ``SEARCH_SERVICE_FACET_LIMIT`` most used; the full
+tag list is served by ``daycares/services/``. The block is cached for ``CACHE_SECONDS`` under a key built from the normalized filter parameters
+(ordering and paging don't change the result set), so paging through or
+re-sorting results never recomputes it.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils.text import slugify
+
+from users.models import AREA_CHOICES
+from .caching import get_version
+from .listing_cache import VERSION_NAME as LISTING_VERSION_NAME
+
+CACHE_PREFIX = 'booking:search-facets:'
+CACHE_SECONDS = 60
+
+# Cumulative, matching the ?min_rating= filter
+RATING_BANDS = [('4+', 4), ('3+', 3), ('2+', 2), ('1+', 1)]
+# (key, lower bound inclusive, upper bound exclusive) over the cheapest active tier
+# of the searched frequency (the ``price`` annotation)
+PRICE_BANDS = [
+    ('under_5000', None, 5000),
+    ('5000_10000', 5000, 10000),
+    ('10000_20000', 10000, 20000),
+    ('20000_plus', 20000, None),
+]
+
+# Parameters that only order or page the same result set
+IGNORED_PARAMS = {'ordering', 'cursor', 'page_size', 'include_total'}
+
+
+def cache_key(params):
+    normalized = []
+    for name in sorted(set(params) - IGNORED_PARAMS):
+        values = params.getlist(name)
+        if name == 'services':
+            values = [','.join(sorted({slugify(s) for v in values for s in v.split(',')} - {''}))]
+        elif name == 'search':
+            values = [' '.join(v.lower().split()) for v in values]
+        normalized.append(f'{name}={"|".join(values)}')
+    digest = hashlib.sha1('&'.join(normalized).encode()).hexdigest()
+    return f'{CACHE_PREFIX}{get_version(LISTING_VERSION_NAME)}:{digest}'
+
+
+def _price_filter(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def _count(condition=None):
+    return Count('id', filter=condition, distinct=True)
+
+
+def _service_counts(queryset):
+    """(slug, name, daycare count) for the most used tags over ``queryset``, most used first."""
+    return queryset.filter(service_tag_links__isnull=False).values_list(
+        'service_tag_links__tag__slug', 'service_tag_links__tag__name'
+    ).annotate(count=_count()).order_by(
+        '-count', 'service_tag_links__tag__name'
+    )[:settings.SEARCH_SERVICE_FACET_LIMIT]
+
+
+def compute_facets(queryset):
+    queryset = queryset.order_by()
+    aggregates = {'total': _count()}
+    for code, _ in AREA_CHOICES:
+        aggregates[f'area:{code}'] = _count(Q(area=code))
+    for band, minimum in RATING_BANDS:
+        aggregates[f'rating:{band}'] = _count(Q(review_count__gt=0, rating__gte=minimum))
+    for band, low, high in PRICE_BANDS:
+        aggregates[f'price:{band}'] = _count(_price_filter(low, high))
+    counts = queryset.aggregate(**aggregates)
+
+    return {
+        'total': counts['total'],
+        'areas': [
+            {'value': code, 'label': label, 'count': counts[f'area:{code}']}
+            for code, label in AREA_CHOICES
+        ],
+        'ratings': [
+            {'value': band, 'min_rating': minimum, 'count': counts[f'rating:{band}']}
+            for band, minimum in RATING_BANDS
+        ],
+        'prices': [
+            {'value': band, 'min_price': low, 'max_price': high, 'count': counts[f'price:{band}']}
+            for band, low, high in PRICE_BANDS
+        ],
+        'services': [
+            {'value': slug, 'label': name, 'count': count}
+            for slug, name, count in _service_counts(queryset)
+        ],
+    }
+
+
+def search_facets(queryset, params):
+    """Facet block for the filtered search ``queryset``, cached per filter set."""
+    key = cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, timeout=CACHE_SECONDS)
+    return facets
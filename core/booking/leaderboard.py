@@ -0,0 +1,40 @@
+"""
+Popular-daycares leaderboard.
+
+The ranking (booking count, then rating) is an aggregate over every
+booking, so it is computed into a small snapshot of ``(daycare_id,
+booking_count)`` pairs held in the cache. The snapshot is rebuilt every
+``REFRESH_SECONDS``, or sooner after booking/review events bump
+``VERSION_NAME``; concurrent refreshes are coalesced by single_flight().
+"""
+from django.db.models import Count
+
+from .caching import bump_version, single_flight
+from .queries import verified_daycares
+
+CACHE_KEY = 'booking:popular-daycares'
+VERSION_NAME = 'popular-daycares'
+SIZE = 10
+REFRESH_SECONDS = 600
+MIN_REBUILD_INTERVAL = 30
+
+
+def build_snapshot():
+    rows = verified_daycares().prefetch_related(None).annotate(
+        booking_count=Count('bookings')
+    ).filter(
+        booking_count__gt=0
+    ).order_by('-booking_count', '-rating').values_list('id', 'booking_count')[:SIZE]
+    return list(rows)
+
+
+def popular_snapshot():
+    """Ordered [(daycare_id, booking_count), ...] for the current leaderboard."""
+    return single_flight(
+        CACHE_KEY, build_snapshot, REFRESH_SECONDS,
+        version_name=VERSION_NAME, min_rebuild_interval=MIN_REBUILD_INTERVAL,
+    )
+
+
+def mark_leaderboard_stale():
+    bump_version(VERSION_NAME)
@@ -0,0 +1,48 @@
+"""
+Scheduled booking lifecycle: expire, activate and complete bookings by date.
+
+Nothing else moves a confirmed booking to ``active`` when its start date
+arrives, to ``completed`` once its end date has passed, or expires a
+``pending`` request the daycare never answered. ``advance_lifecycle`` does
+all three through the SCHEDULED_ACTIONS transitions, in chunks of
+``batch_size`` ids picked off the ``start_date`` index, each chunk its own
+short transaction. Every chunk re-checks status and dates in its UPDATE, so
+runs are idempotent and can overlap or stop anywhere; a run that hits
+``max_seconds`` simply leaves the rest for the next one.
+"""
+import time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking
+from .transitions import SCHEDULED_ACTIONS, apply_to
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_SECONDS = 60
+
+
+def advance_lifecycle(batch_size=DEFAULT_BATCH_SIZE, max_seconds=DEFAULT_MAX_SECONDS):
+    """
+    Run the scheduled transitions until nothing is due or ``max_seconds``
+    has passed. Returns ({action: bookings moved}, finished).
+    """
+    deadline = time.monotonic() + max_seconds
+    now = timezone.now()
+    moved = {action: 0 for action in SCHEDULED_ACTIONS}
+    for action, transition in SCHEDULED_ACTIONS.items():
+        # Every due booking has started (end_date is never before start_date),
+        # which lets the start_date index narrow each chunk's scan
+        due = Booking.objects.filter(
+            transition.condition(now), Q(start_date__lte=now.date())
+        ).order_by('start_date', 'pk').values_list('pk', flat=True)
+        while True:
+            if time.monotonic() >= deadline:
+                return moved, False
+            chunk = list(due[:batch_size])
+            if not chunk:
+                break
+            moved[action] += len(apply_to(transition, Booking.objects.filter(pk__in=chunk), 'system', now))
+            if len(chunk) < batch_size:
+                break
+    return moved, True
@@ -0,0 +1,92 @@
+"""
+Shared response caches for the daycare listing and detail endpoints.
+
+The listing is anonymous and identical for every visitor, so each page is
+rendered once to JSON bytes and stored under a key that folds in the
+``VERSION_NAME`` counter (bumped by signals whenever a daycare, its images,
+reviews or availability change), today's date (the slots annotation is
+per weekday), the host and the query string. The strong ETag is a hash of
+those bytes, so clients revalidating an unchanged page get a 304 without
+the database being touched.
+
+Detail payloads are cached per daycare under their own version counter,
+bumped when the daycare or one of the child rows it embeds (reviews,
+availability, images, pricing tiers) changes, so an edit to one daycare
+never evicts another's page. The TTL bounds staleness from rows the
+payload only references, such as a reviewer's display name.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from .caching import bump_version, get_version
+
+CACHE_PREFIX = 'booking:public-daycares:'
+VERSION_NAME = 'public-daycares'
+# Entries are never served across versions; the timeout only bounds memory
+CACHE_TIMEOUT = 60 * 60
+CLIENT_MAX_AGE = 60
+
+DETAIL_CACHE_PREFIX = 'booking:daycare-detail:'
+DETAIL_VERSION_PREFIX = 'daycare-detail:'
+DETAIL_CACHE_TIMEOUT = 10 * 60
+
+
+def cache_key(request):
+    params = request.GET.urlencode()
+    digest = hashlib.sha1(f'{request.get_host()}?{params}'.encode()).hexdigest()
+    return f'{CACHE_PREFIX}{get_version(VERSION_NAME)}:{timezone.now().date().isoformat()}:{digest}'
+
+
+def cached_listing(request, build):
+    """
+    Serve ``build()`` (which returns a DRF Response) from the shared cache,
+    honouring If-None-Match / If-Modified-Since.
+    """
+    key = cache_key(request)
+    entry = cache.get(key)
+    if entry is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+        content = JSONRenderer().render(response.data)
+        entry = {
+            'content': content,
+            'etag': '"%s"' % hashlib.sha1(content).hexdigest(),
+            'last_modified': int(time.time()),
+        }
+        cache.set(key, entry, timeout=CACHE_TIMEOUT)
+
+    response = HttpResponse(entry['content'], content_type='application/json')
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    patch_cache_control(response, public=True, max_age=CLIENT_MAX_AGE)
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
+
+
+def mark_listing_stale():
+    bump_version(VERSION_NAME)
+
+
+def cached_detail(request, daycare_id, build):
+    """Serialized detail payload for one daycare; ``build()`` runs on a miss."""
+    version = get_version(f'{DETAIL_VERSION_PREFIX}{daycare_id}')
+    # Image URLs are absolute, so the host is part of the key
+    key = f'{DETAIL_CACHE_PREFIX}{daycare_id}:{version}:{request.get_host()}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=DETAIL_CACHE_TIMEOUT)
+    return data
+
+
+def mark_daycare_stale(daycare_id):
+    bump_version(f'{DETAIL_VERSION_PREFIX}{daycare_id}')
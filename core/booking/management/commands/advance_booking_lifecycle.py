@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from booking.lifecycle import DEFAULT_BATCH_SIZE, DEFAULT_MAX_SECONDS, advance_lifecycle
+
+
+class Command(BaseCommand):
+    help = "Expire unanswered requests and activate/complete bookings whose dates have come; safe to run every few minutes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS)
+
+    def handle(self, *args, **options):
+        moved, finished = advance_lifecycle(
+            batch_size=options['batch_size'], max_seconds=options['max_seconds']
+        )
+        summary = ', '.join(f"{count} {action}" for action, count in moved.items())
+        if finished:
+            self.stdout.write(self.style.SUCCESS(f"Booking lifecycle up to date ({summary})"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Stopped at the time limit ({summary}); the next run continues"))
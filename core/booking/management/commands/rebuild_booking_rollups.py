@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.rollups import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily booking rollups (per daycare and per parent) from the bookings table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        written = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily rollup rows"))
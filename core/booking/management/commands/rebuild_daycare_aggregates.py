@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from booking.pricing import rebuild_all_price_summaries
+from booking.ratings import rebuild_all_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalised review aggregates and price summaries of every DaycareCenter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = rebuild_all_ratings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} daycares"))
+        summaries = rebuild_all_price_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {summaries} price summaries"))
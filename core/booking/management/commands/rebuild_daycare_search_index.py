@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from booking.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index used by the daycare search endpoint"
+
+    def handle(self, *args, **options):
+        if rebuild_index():
+            self.stdout.write(self.style.SUCCESS("Daycare search index rebuilt"))
+        else:
+            self.stdout.write(self.style.WARNING("This database has no full-text backend; nothing to rebuild"))
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Avg, Count
+
+ASPECT_FIELDS = {
+    'avg_cleanliness_rating': 'cleanliness_rating',
+    'avg_staff_rating': 'staff_rating',
+    'avg_communication_rating': 'communication_rating',
+    'avg_value_rating': 'value_rating',
+}
+
+
+def backfill(apps, schema_editor):
+    DaycareCenter = apps.get_model('users', 'DaycareCenter')
+    BookingReview = apps.get_model('booking', 'BookingReview')
+
+    grouped = BookingReview.objects.filter(is_approved=True).values('daycare').annotate(
+        avg_rating=Avg('rating'),
+        total=Count('id'),
+        **{field: Avg(source) for field, source in ASPECT_FIELDS.items()},
+    ).order_by()
+    for row in grouped:
+        DaycareCenter.objects.filter(pk=row['daycare']).update(
+            rating=row['avg_rating'] or 0.0,
+            review_count=row['total'],
+            **{field: row[field] for field in ASPECT_FIELDS},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0005_daycarepricing_is_active"),
+        ("users", "0013_daycarecenter_review_aggregates"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
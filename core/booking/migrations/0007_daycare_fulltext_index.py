@@ -0,0 +1,58 @@
+from django.db import migrations
+
+SQLITE_TABLE = 'booking_daycare_fts'
+POSTGRES_TABLE = 'booking_daycare_search'
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            f"name, address, services, description, "
+            f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, name, address, services, description) "
+            f"SELECT id, COALESCE(name, ''), COALESCE(address, ''), COALESCE(services, ''), "
+            f"COALESCE(description, '') FROM users_daycarecenter"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            f"daycare_id bigint PRIMARY KEY REFERENCES users_daycarecenter(id) "
+            f"ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin "
+            f"ON {POSTGRES_TABLE} USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {POSTGRES_TABLE} (daycare_id, document) "
+            f"SELECT id, "
+            f"setweight(to_tsvector('simple', COALESCE(name, '')), 'A') || "
+            f"setweight(to_tsvector('simple', COALESCE(address, '')), 'C') || "
+            f"setweight(to_tsvector('simple', COALESCE(services, '')), 'B') || "
+            f"setweight(to_tsvector('simple', COALESCE(description, '')), 'D') "
+            f"FROM users_daycarecenter"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0006_backfill_daycare_review_aggregates"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
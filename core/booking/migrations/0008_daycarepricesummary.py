@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_daycare_fulltext_index'),
+        ('users', '0016_coordinates_and_grid_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaycarePriceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('Monthly', 'Monthly'), ('Daily', 'Daily')], max_length=10)),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('daycare', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_summaries', to='users.daycarecenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['frequency', 'min_price'], name='booking_day_frequen_b8b2a7_idx'), models.Index(fields=['frequency', 'max_price'], name='booking_day_frequen_e6ef0a_idx')],
+                'unique_together': {('daycare', 'frequency')},
+            },
+        ),
+    ]
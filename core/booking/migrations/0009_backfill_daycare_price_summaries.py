@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Max, Min
+
+
+def backfill(apps, schema_editor):
+    DaycarePricing = apps.get_model('booking', 'DaycarePricing')
+    DaycarePriceSummary = apps.get_model('booking', 'DaycarePriceSummary')
+
+    grouped = DaycarePricing.objects.filter(is_active=True).values('daycare', 'frequency').annotate(
+        min_price=Min('price'),
+        max_price=Max('price'),
+    ).order_by()
+    DaycarePriceSummary.objects.bulk_create([
+        DaycarePriceSummary(
+            daycare_id=row['daycare'], frequency=row['frequency'],
+            min_price=row['min_price'], max_price=row['max_price'],
+        )
+        for row in grouped
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0008_daycarepricesummary"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count, Max, Min
+
+
+def dedupe(apps, schema_editor):
+    DaycarePricing = apps.get_model('booking', 'DaycarePricing')
+    DaycarePriceSummary = apps.get_model('booking', 'DaycarePriceSummary')
+
+    # Keep the most recently created tier of each (daycare, name, frequency)
+    duplicated = DaycarePricing.objects.filter(name__isnull=False).values('daycare', 'name', 'frequency').annotate(
+        copies=Count('id'), keep=Max('id'),
+    ).filter(copies__gt=1).order_by()
+    daycare_ids = set()
+    for row in duplicated:
+        DaycarePricing.objects.filter(
+            daycare_id=row['daycare'], name=row['name'], frequency=row['frequency'],
+        ).exclude(id=row['keep']).delete()
+        daycare_ids.add(row['daycare'])
+    if not daycare_ids:
+        return
+
+    # Deleting here sends no signals, so refresh the affected price summaries
+    DaycarePriceSummary.objects.filter(daycare_id__in=daycare_ids).delete()
+    grouped = DaycarePricing.objects.filter(daycare_id__in=daycare_ids, is_active=True).values(
+        'daycare', 'frequency'
+    ).annotate(
+        min_price=Min('price'),
+        max_price=Max('price'),
+    ).order_by()
+    DaycarePriceSummary.objects.bulk_create([
+        DaycarePriceSummary(
+            daycare_id=row['daycare'], frequency=row['frequency'],
+            min_price=row['min_price'], max_price=row['max_price'],
+        )
+        for row in grouped
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0009_backfill_daycare_price_summaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+    ]
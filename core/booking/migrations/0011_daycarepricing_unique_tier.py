@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_dedupe_daycare_pricing'),
+        ('users', '0016_coordinates_and_grid_index'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='daycarepricing',
+            unique_together={('daycare', 'name', 'frequency')},
+        ),
+    ]
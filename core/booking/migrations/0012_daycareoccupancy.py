@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_daycarepricing_unique_tier'),
+        ('users', '0016_coordinates_and_grid_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaycareOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('used', models.PositiveIntegerField(default=0)),
+                ('daycare', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='users.daycarecenter')),
+            ],
+            options={
+                'verbose_name_plural': 'Daycare occupancy',
+                'unique_together': {('daycare', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import migrations
+
+DEFAULT_CAPACITY = 30
+
+
+def backfill(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    DaycareAvailability = apps.get_model('booking', 'DaycareAvailability')
+    DaycareOccupancy = apps.get_model('booking', 'DaycareOccupancy')
+
+    capacities = {
+        (row.daycare_id, row.day_of_week): row.max_capacity if row.is_available else 0
+        for row in DaycareAvailability.objects.all()
+    }
+    today = date.today()
+    used = Counter()
+    bookings = Booking.objects.filter(
+        status__in=['pending', 'confirmed', 'active'], end_date__gte=today
+    ).values_list('daycare_id', 'start_date', 'end_date')
+    for daycare_id, start_date, end_date in bookings.iterator():
+        days = max((end_date - start_date).days, 1) if end_date else 1
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            capacity = capacities.get((daycare_id, day.strftime('%A').lower()), DEFAULT_CAPACITY)
+            if day >= today and capacity > 0:
+                used[daycare_id, day] += 1
+
+    DaycareOccupancy.objects.bulk_create([
+        DaycareOccupancy(
+            daycare_id=daycare_id, date=day, used=count,
+            capacity=capacities.get((daycare_id, day.strftime('%A').lower()), DEFAULT_CAPACITY),
+        )
+        for (daycare_id, day), count in used.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0012_daycareoccupancy"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
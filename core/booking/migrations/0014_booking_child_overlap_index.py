@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_backfill_daycare_occupancy'),
+        ('users', '0016_coordinates_and_grid_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['child', 'status', 'start_date', 'end_date'], name='booking_boo_child_i_0678f2_idx'),
+        ),
+    ]
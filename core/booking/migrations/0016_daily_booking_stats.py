@@ -0,0 +1,82 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:55
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0015_booking_status_expired'),
+        ('users', '0016_coordinates_and_grid_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaycareDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('confirmed', models.PositiveIntegerField(default=0)),
+                ('active', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('expired', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12)),
+                ('children', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Daycare daily stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='ParentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('confirmed', models.PositiveIntegerField(default=0)),
+                ('active', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('expired', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12)),
+                ('children', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Parent daily stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['daycare', 'created_at'], name='booking_boo_daycare_8c7910_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['parent', 'created_at'], name='booking_boo_parent__3bb2e6_idx'),
+        ),
+        migrations.AddField(
+            model_name='daycaredailystats',
+            name='daycare',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='users.daycarecenter'),
+        ),
+        migrations.AddField(
+            model_name='parentdailystats',
+            name='parent',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='users.parent'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='daycaredailystats',
+            unique_together={('daycare', 'date')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='parentdailystats',
+            unique_together={('parent', 'date')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+STATUSES = ['pending', 'confirmed', 'active', 'completed', 'cancelled', 'rejected', 'expired']
+
+
+def backfill(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    rollups = {
+        'daycare': apps.get_model('booking', 'DaycareDailyStats'),
+        'parent': apps.get_model('booking', 'ParentDailyStats'),
+    }
+
+    for owner, model in rollups.items():
+        grouped = Booking.objects.annotate(day=TruncDate('created_at')).values(f'{owner}_id', 'day').annotate(
+            bookings=Count('id'),
+            **{status: Count('id', filter=Q(status=status)) for status in STATUSES},
+            revenue=Coalesce(Sum('paid_amount'), Value(Decimal('0')), output_field=DecimalField()),
+            children=Count('child', distinct=True),
+        ).order_by()
+        model.objects.bulk_create([
+            model(
+                date=row['day'], **{f'{owner}_id': row[f'{owner}_id']},
+                **{field: row[field] for field in ['bookings', *STATUSES, 'revenue', 'children']},
+            )
+            for row in grouped
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0016_daily_booking_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0017_backfill_daily_booking_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='closed_dates',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
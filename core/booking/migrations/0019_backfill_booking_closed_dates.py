@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from django.db import migrations
+
+DEFAULT_CAPACITY = 30
+
+
+def backfill(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    DaycareAvailability = apps.get_model('booking', 'DaycareAvailability')
+
+    capacities = {
+        (row.daycare_id, row.day_of_week): row.max_capacity if row.is_available else 0
+        for row in DaycareAvailability.objects.all()
+    }
+    # Same bookings and day capacities the ledger was backfilled from (0013)
+    bookings = Booking.objects.filter(
+        status__in=['pending', 'confirmed', 'active'], end_date__gte=date.today()
+    ).only('id', 'daycare_id', 'start_date', 'end_date')
+    updated = []
+    for booking in bookings.iterator():
+        days = max((booking.end_date - booking.start_date).days, 1)
+        closed = [
+            day.isoformat()
+            for day in (booking.start_date + timedelta(days=offset) for offset in range(days))
+            if capacities.get((booking.daycare_id, day.strftime('%A').lower()), DEFAULT_CAPACITY) <= 0
+        ]
+        if closed:
+            booking.closed_dates = closed
+            updated.append(booking)
+    Booking.objects.bulk_update(updated, ['closed_dates'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0018_booking_closed_dates"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
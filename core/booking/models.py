@@ -18,8 +18,37 @@ class DaycarePricing(models.Model):
     frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='Monthly')
     is_active = models.BooleanField(default=True)
     
+    class Meta:
+        # The key update_daycare_pricing upserts tiers on
+        unique_together = ['daycare', 'name', 'frequency']
+    
     def __str__(self):
         return f"{self.name} ({self.get_frequency_display()}) - {self.price}"
+
+
+class DaycarePriceSummary(models.Model):
+    """
+    Cheapest and dearest active DaycarePricing tier per daycare and frequency,
+    maintained by booking.pricing so search can filter and sort on price
+    through an index instead of aggregating tiers per request.
+    """
+    daycare = models.ForeignKey(DaycareCenter, on_delete=models.CASCADE, related_name='price_summaries')
+    frequency = models.CharField(max_length=10, choices=DaycarePricing.FREQUENCY_CHOICES)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['daycare', 'frequency']
+        indexes = [
+            models.Index(fields=['frequency', 'min_price']),
+            models.Index(fields=['frequency', 'max_price']),
+        ]
+
+    def __str__(self):
+        return f"{self.daycare.name} ({self.frequency}): {self.min_price}-{self.max_price}"
+
+
 class Booking(models.Model):
     BOOKING_TYPE_CHOICES = [
         ('monthly', 'Monthly Care'),
@@ -33,6 +62,7 @@ class Booking(models.Model):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
         ('rejected', 'Rejected'),
+        ('expired', 'Expired'),
     ]
     
     PAYMENT_STATUS_CHOICES = [
@@ -62,6 +92,9 @@ class Booking(models.Model):
     end_date = models.DateField(null=True, blank=True)
     start_time = models.TimeField(null=True, blank=True)
     end_time = models.TimeField(null=True, blank=True)
+    # ISO dates in the stay the daycare was closed on when places were
+    # reserved; they hold no place in the occupancy ledger
+    closed_dates = models.JSONField(default=list, blank=True)
     
     # Status and Payment
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -97,6 +130,11 @@ class Booking(models.Model):
             models.Index(fields=['parent', 'status']),
             models.Index(fields=['daycare', 'status']),
             models.Index(fields=['start_date']),
+            # Overlap check on booking create
+            models.Index(fields=['child', 'status', 'start_date', 'end_date']),
+            # Recomputing one day's rollup rows (booking.rollups)
+            models.Index(fields=['daycare', 'created_at']),
+            models.Index(fields=['parent', 'created_at']),
         ]
     
     def __str__(self):
@@ -125,12 +163,12 @@ class Booking(models.Model):
     def is_active(self):
         return self.status in ['confirmed', 'active'] and self.start_date <= timezone.now().date()
     
-    def can_be_cancelled(self):
+    def can_be_cancelled(self, now=None):
         """Check if booking can be cancelled (at least 24 hours before start)"""
         if self.status not in ['pending', 'confirmed']:
             return False
         
-        cancellation_deadline = timezone.now() + timedelta(hours=24)
+        cancellation_deadline = (now or timezone.now()) + timedelta(hours=24)
         booking_start = timezone.datetime.combine(self.start_date, self.start_time or timezone.datetime.min.time())
         
         return booking_start > cancellation_deadline
@@ -243,6 +281,29 @@ class DaycareAvailability(models.Model):
         return self.current_bookings >= self.max_capacity
 
 
+class DaycareOccupancy(models.Model):
+    """
+    Places taken per daycare per calendar day. Bookings reserve a place on
+    every open day they cover with a conditional UPDATE (see
+    booking.occupancy), so concurrent creates can't oversubscribe a day.
+    """
+    daycare = models.ForeignKey(DaycareCenter, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    capacity = models.PositiveIntegerField()
+    used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['daycare', 'date']
+        verbose_name_plural = 'Daycare occupancy'
+
+    def __str__(self):
+        return f"{self.daycare.name} - {self.date}: {self.used}/{self.capacity}"
+
+    @property
+    def available_slots(self):
+        return max(0, self.capacity - self.used)
+
+
 class BookingPayment(models.Model):
     PAYMENT_METHOD_CHOICES = [
         ('cash', 'Cash'),
@@ -281,4 +342,49 @@ class BookingPayment(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"Payment #{self.id} - ৳{self.amount} for Booking #{self.booking.id}"
\ No newline at end of file
+        return f"Payment #{self.id} - ৳{self.amount} for Booking #{self.booking.id}"
+
+
+class DailyBookingStats(models.Model):
+    """
+    Rollup of the bookings created on one day, maintained by booking.rollups
+    in the same transaction as each booking change so dashboards can sum a
+    few hundred rows instead of scanning every booking.
+    """
+    date = models.DateField()
+    bookings = models.PositiveIntegerField(default=0)
+    pending = models.PositiveIntegerField(default=0)
+    confirmed = models.PositiveIntegerField(default=0)
+    active = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    expired = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
+    # Distinct children among the day's bookings; not additive across days
+    children = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DaycareDailyStats(DailyBookingStats):
+    daycare = models.ForeignKey(DaycareCenter, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        unique_together = ['daycare', 'date']
+        verbose_name_plural = 'Daycare daily stats'
+
+    def __str__(self):
+        return f"{self.daycare.name} - {self.date}: {self.bookings} bookings"
+
+
+class ParentDailyStats(DailyBookingStats):
+    parent = models.ForeignKey(Parent, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        unique_together = ['parent', 'date']
+        verbose_name_plural = 'Parent daily stats'
+
+    def __str__(self):
+        return f"{self.parent.full_name} - {self.date}: {self.bookings} bookings"
@@ -0,0 +1,222 @@
+"""
+Per-date occupancy ledger.
+
+Every open day a pending, confirmed or active booking covers holds one place
+in that day's DaycareOccupancy row. Reserving is a single conditional
+``UPDATE ... SET used = used + 1 WHERE used < capacity`` over the booked
+dates, run in the same transaction as the booking write: if it touches
+fewer rows than there are dates, some day filled up concurrently and the
+transaction is rolled back. Capacity checks are therefore index lookups on
+(daycare, date), never scans over bookings. ``reserve_many`` does the same
+for a batch of stays, adding each day's total demand
+with one UPDATE per distinct per-day count.
+
+Day capacities come from DaycareAvailability (``max_capacity``, or 0 when
+``is_available`` is off); weekdays without an availability row get the
+model's default capacity. Closed days hold no places: the days a booking
+covers while the daycare is closed are stored on it (``Booking.closed_dates``)
+so releasing gives back exactly the places that were taken, even if one
+of those days has reopened since.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .availability_matrix import record_places
+from .listing_cache import mark_listing_stale
+from .models import DaycareAvailability, DaycareOccupancy
+
+DEFAULT_CAPACITY = DaycareAvailability._meta.get_field('max_capacity').default
+HOLDING_STATUSES = ('pending', 'confirmed', 'active')
+
+
+class CapacityError(Exception):
+    """Raised when a booking can't get a place on every day it covers."""
+
+    def __init__(self, message, full_dates=()):
+        super().__init__(message)
+        self.full_dates = list(full_dates)
+
+
+def booked_dates(start_date, end_date):
+    """Calendar days a booking covers: start_date up to (not including) end_date."""
+    days = max((end_date - start_date).days, 1) if end_date else 1
+    return [start_date + timedelta(days=offset) for offset in range(days)]
+
+
+def day_capacities(daycare_id):
+    """{weekday name: places} from the daycare's availability rows."""
+    return daycares_capacities([daycare_id])[daycare_id]
+
+
+def daycares_capacities(daycare_ids):
+    """{daycare id: {weekday name: places}} for several daycares in one query."""
+    capacities = {daycare_id: {} for daycare_id in daycare_ids}
+    rows = DaycareAvailability.objects.filter(daycare_id__in=list(capacities)).values_list(
+        'daycare_id', 'day_of_week', 'max_capacity', 'is_available'
+    )
+    for daycare_id, day_of_week, max_capacity, is_available in rows:
+        capacities[daycare_id][day_of_week] = max_capacity if is_available else 0
+    return capacities
+
+
+def weekday(day):
+    return day.strftime('%A').lower()
+
+
+def _open_dates(capacities, start_date, end_date):
+    return {
+        day: capacities.get(weekday(day), DEFAULT_CAPACITY)
+        for day in booked_dates(start_date, end_date)
+        if capacities.get(weekday(day), DEFAULT_CAPACITY) > 0
+    }
+
+
+def _touches_today(dates):
+    return timezone.now().date() in dates
+
+
+def reserve_places(daycare_id, start_date, end_date):
+    """
+    Take one place on each open day in [start_date, end_date) or raise
+    CapacityError (rolling back any places taken). Call it in the same
+    transaction that writes the booking, and store the returned closed
+    days on it as ``closed_dates``.
+    """
+    (error,), (closed,) = reserve_many([(daycare_id, start_date, end_date)])
+    if error is not None:
+        raise error
+    return closed
+
+
+@transaction.atomic
+def reserve_many(stays, partial=False):
+    """
+    Take places for several stays, each a (daycare_id, start_date, end_date)
+    tuple, with one ledger insert, one ledger read and one conditional
+    UPDATE per distinct number of places taken on a day.
+
+    Returns two lists parallel to ``stays``: None for a stay that got its
+    places or the CapacityError that stopped it, and the stay's closed days
+    (ISO dates, as stored in ``Booking.closed_dates``). Stays compete in
+    order, so an earlier stay can fill a day a later one needs. Unless
+    ``partial`` is set nothing is taken when any stay fails. Raises
+    CapacityError if a day fills up concurrently between the read and the
+    update.
+    """
+    capacities = daycares_capacities({daycare_id for daycare_id, _, _ in stays})
+    wanted = [
+        (daycare_id, _open_dates(capacities[daycare_id], start_date, end_date))
+        for daycare_id, start_date, end_date in stays
+    ]
+    rows = {(daycare_id, day): places for daycare_id, days in wanted for day, places in days.items()}
+    DaycareOccupancy.objects.bulk_create(
+        [DaycareOccupancy(daycare_id=daycare_id, date=day, capacity=places) for (daycare_id, day), places in rows.items()],
+        ignore_conflicts=True,
+    )
+    free = {
+        (daycare_id, day): capacity - used
+        for daycare_id, day, capacity, used in DaycareOccupancy.objects.filter(
+            daycare_id__in=list(capacities),
+            date__in={day for _, day in rows},
+        ).values_list('daycare_id', 'date', 'capacity', 'used')
+    }
+
+    closed = [
+        [day.isoformat() for day in booked_dates(start_date, end_date) if day not in days]
+        for (_, start_date, end_date), (_, days) in zip(stays, wanted)
+    ]
+    errors = []
+    demand = Counter()
+    for daycare_id, days in wanted:
+        full_dates = [day for day in days if free.get((daycare_id, day), 0) - demand[daycare_id, day] <= 0]
+        if not days:
+            errors.append(CapacityError("The daycare is closed on the requested dates."))
+        elif full_dates:
+            errors.append(CapacityError(
+                "The daycare is fully booked on some of the requested dates.", sorted(full_dates)
+            ))
+        else:
+            errors.append(None)
+            demand.update((daycare_id, day) for day in days)
+    if not partial and any(errors):
+        return errors, closed
+
+    _take(demand)
+    return errors, closed
+
+
+def _rows(days_by_daycare):
+    """Q for the ledger rows of {daycare id: [dates]}."""
+    rows = Q(pk__in=[])
+    for daycare_id, dates in days_by_daycare.items():
+        rows |= Q(daycare_id=daycare_id, date__in=dates)
+    return rows
+
+
+def _take(demand):
+    """Add ``demand[(daycare_id, day)]`` to each ledger row's used count, or raise."""
+    by_count = defaultdict(lambda: defaultdict(list))
+    for (daycare_id, day), count in demand.items():
+        by_count[count][daycare_id].append(day)
+    for count, days_by_daycare in by_count.items():
+        taken = DaycareOccupancy.objects.filter(_rows(days_by_daycare), used__lte=F('capacity') - count).update(
+            used=F('used') + count
+        )
+        if taken != sum(len(dates) for dates in days_by_daycare.values()):
+            # Another booking took the last place on one of the days since the read
+            raise CapacityError("The daycare is fully booked on some of the requested dates.")
+        for daycare_id, dates in days_by_daycare.items():
+            transaction.on_commit(
+                lambda daycare_id=daycare_id, dates=dates, delta=-count: record_places(daycare_id, dates, delta)
+            )
+    if _touches_today({day for _, day in demand}):
+        mark_listing_stale()
+
+
+def release_places(booking):
+    """Give back the places a booking held; call when it leaves HOLDING_STATUSES."""
+    release_many([(booking.daycare_id, booking.start_date, booking.end_date, booking.closed_dates)])
+
+
+def release_many(stays):
+    """
+    Give back the places several (daycare_id, start_date, end_date,
+    closed_dates) stays held; their closed days never took one.
+    """
+    demand = Counter(
+        (daycare_id, day) for daycare_id, start_date, end_date, closed_dates in stays
+        for day in booked_dates(start_date, end_date) if day.isoformat() not in closed_dates
+    )
+    held = DaycareOccupancy.objects.filter(
+        daycare_id__in={daycare_id for daycare_id, _ in demand},
+        date__in={day for _, day in demand},
+        used__gt=0,
+    ).values_list('daycare_id', 'date', 'used')
+    returned = defaultdict(lambda: defaultdict(list))
+    for daycare_id, day, used in held:
+        if (daycare_id, day) in demand:
+            returned[min(used, demand[daycare_id, day])][daycare_id].append(day)
+    for count, days_by_daycare in returned.items():
+        DaycareOccupancy.objects.filter(_rows(days_by_daycare)).update(used=F('used') - count)
+        for daycare_id, dates in days_by_daycare.items():
+            transaction.on_commit(
+                lambda daycare_id=daycare_id, dates=dates, delta=count: record_places(daycare_id, dates, delta)
+            )
+    if _touches_today({day for _, day in demand}):
+        mark_listing_stale()
+
+
+def sync_capacity(availability):
+    """Apply an availability change to the ledger rows of upcoming matching weekdays."""
+    # DAY_CHOICES starts on Monday; Django's week_day lookup counts from Sunday = 1
+    index = [day for day, _ in DaycareAvailability.DAY_CHOICES].index(availability.day_of_week)
+    week_day = (index + 1) % 7 + 1
+    DaycareOccupancy.objects.filter(
+        daycare_id=availability.daycare_id,
+        date__gte=timezone.now().date(),
+        date__week_day=week_day,
+    ).update(capacity=availability.max_capacity if availability.is_available else 0)
@@ -0,0 +1,209 @@
+"""
+Keyset (cursor) pagination for the booking list endpoints.
+
+Pages are addressed by the ordering values of the last row returned
+rather than an offset, so fetching page N costs the same index range
+scan as page 1. The queryset's ordering (from OrderingFilter, the view's
+``ordering`` or the model's Meta.ordering) is always completed with the
+primary key as a tie-breaker, and NULLs are sorted last, which makes the
+cursor position unambiguous. Only nullable columns and annotations get the
+NULLS LAST ordering and ``IS NULL`` cursor terms: NOT NULL columns use
+plain comparisons, so a cursor on e.g. (parent, created_at) stays an
+index range seek instead of a filtered scan from the first row.
+
+Totals are opt-in (``?include_total=true``) and capped: counting a large
+daycare's full booking history on every page would defeat the purpose.
+"""
+import base64
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'d': value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {'dec': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return datetime.date.fromisoformat(value['d'])
+        if 'dec' in value:
+            return decimal.Decimal(value['dec'])
+        raise ValueError('Unknown cursor value')
+    return value
+
+
+def _resolve(obj, field):
+    for part in field.split('__'):
+        obj = getattr(obj, part, None)
+        if obj is None:
+            return None
+    return obj
+
+
+def _is_nullable(queryset, field):
+    """Whether ``field`` (a lookup path or an annotation) can be NULL."""
+    if field in queryset.query.annotations:
+        return True
+    model = queryset.model
+    for part in field.split('__'):
+        try:
+            model_field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return True
+        if model_field.null:
+            return True
+        model = model_field.related_model
+        if model is None:
+            break
+    return False
+
+
+def _order_by(field, descending, nullable):
+    expression = F(field)
+    if not nullable:
+        return expression.desc() if descending else expression.asc()
+    return expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True)
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    total_query_param = 'include_total'
+    total_count_cap = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.nullable = {field for field, _ in self.ordering if _is_nullable(queryset, field)}
+        queryset = queryset.order_by(*(
+            _order_by(field, descending, field in self.nullable) for field, descending in self.ordering
+        ))
+
+        self.total = None
+        if request.query_params.get(self.total_query_param) == 'true':
+            self.total = queryset[:self.total_count_cap + 1].count()
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            try:
+                queryset = queryset.filter(self.after(self.decode_cursor(encoded)))
+            except (TypeError, ValueError, ValidationError):
+                # Well-formed cursor whose values don't fit the ordering's fields
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        """[(field, descending), ...] ending with the primary key."""
+        ordering = list(queryset.query.order_by) or list(getattr(view, 'ordering', None) or []) \
+            or list(queryset.model._meta.ordering)
+        resolved = []
+        for item in ordering:
+            if isinstance(item, OrderBy):
+                resolved.append((item.expression.name, item.descending))
+            else:
+                resolved.append((item.lstrip('-'), item.startswith('-')))
+        pk_names = {'pk', 'id', queryset.model._meta.pk.name}
+        if not any(field in pk_names for field, _ in resolved):
+            descending = resolved[-1][1] if resolved else False
+            resolved.append(('pk', descending))
+        return resolved
+
+    def after(self, values):
+        """Rows strictly after the cursor position, for a NULLS LAST ordering."""
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q(pk__in=[])
+        equal_so_far = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            if value is None:
+                # Nothing sorts strictly after NULL in this column
+                equal_so_far &= Q(**{f'{field}__isnull': True})
+                continue
+            lookup = 'lt' if descending else 'gt'
+            later = Q(**{f'{field}__{lookup}': value})
+            if field in self.nullable:
+                later |= Q(**{f'{field}__isnull': True})
+            condition |= equal_so_far & later
+            equal_so_far &= Q(**{field: value})
+        return condition
+
+    def encode_cursor(self, obj):
+        values = [_encode_value(_resolve(obj, field)) for field, _ in self.ordering]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, encoded):
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return [_decode_value(value) for value in values]
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+        ])
+        if self.total is not None:
+            payload['total'] = min(self.total, self.total_count_cap)
+            payload['total_is_approximate'] = self.total > self.total_count_cap
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'total': {'type': 'integer'},
+                'total_is_approximate': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,47 @@
+"""
+Per-daycare price summaries.
+
+``DaycarePriceSummary`` holds the min/max active tier price for each
+frequency a daycare offers. It is refreshed whenever a DaycarePricing row
+is saved or deleted (see booking.signals), and can be rebuilt in bulk with
+``manage.py rebuild_daycare_aggregates``.
+"""
+from django.db import transaction
+from django.db.models import Max, Min
+
+from .models import DaycarePricing, DaycarePriceSummary
+
+
+def _grouped(pricing):
+    return pricing.filter(is_active=True).values('daycare', 'frequency').annotate(
+        min_price=Min('price'), max_price=Max('price')
+    ).order_by()
+
+
+def refresh_price_summary(daycare_id):
+    """Recompute the price summaries of a single daycare."""
+    rows = list(_grouped(DaycarePricing.objects.filter(daycare_id=daycare_id)))
+    with transaction.atomic():
+        DaycarePriceSummary.objects.filter(daycare_id=daycare_id).exclude(
+            frequency__in=[row['frequency'] for row in rows]
+        ).delete()
+        for row in rows:
+            DaycarePriceSummary.objects.update_or_create(
+                daycare_id=daycare_id, frequency=row['frequency'],
+                defaults={'min_price': row['min_price'], 'max_price': row['max_price']},
+            )
+
+
+def rebuild_all_price_summaries(batch_size=500):
+    """Recreate every daycare's price summaries. Returns the number of summary rows."""
+    summaries = [
+        DaycarePriceSummary(
+            daycare_id=row['daycare'], frequency=row['frequency'],
+            min_price=row['min_price'], max_price=row['max_price'],
+        )
+        for row in _grouped(DaycarePricing.objects.all())
+    ]
+    with transaction.atomic():
+        DaycarePriceSummary.objects.all().delete()
+        DaycarePriceSummary.objects.bulk_create(summaries, batch_size=batch_size)
+    return len(summaries)
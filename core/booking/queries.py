@@ -0,0 +1,172 @@
+"""
+Reusable querysets for the daycare discovery and booking endpoints.
+
+Everything that a search row needs is annotated onto the DaycareCenter
+queryset up front, and everything a booking row needs onto the Booking
+queryset, so serializing a page costs a fixed number of queries.
+"""
+from django.db.models import Count, Exists, F, FilteredRelation, OuterRef, Prefetch, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.text import slugify
+
+from users.geo import bounding_cells, distance_expression
+from users.models import DaycareCenter, DaycareServiceTag, Parent, ServiceTag
+from .models import BookingReview
+
+# Approved reviews embedded in the daycare detail payload
+DETAIL_REVIEW_COUNT = 5
+
+# k-nearest searches start with this radius and double until k rows are found
+NEAREST_START_RADIUS_KM = 2.0
+
+
+def verified_daycares():
+    return DaycareCenter.objects.filter(
+        user__is_verified=True,
+        user__is_email_verified=True
+    ).select_related('user').prefetch_related('service_tags')
+
+
+def with_detail_relations(queryset):
+    """
+    Prefetch everything DaycareDetailSerializer renders: the latest approved
+    reviews (sliced per daycare in SQL, with their parent) as
+    ``latest_reviews``, availability, images and pricing tiers.
+    """
+    return queryset.prefetch_related(
+        Prefetch(
+            'reviews',
+            queryset=BookingReview.objects.filter(is_approved=True).select_related('parent')
+            .order_by('-created_at')[:DETAIL_REVIEW_COUNT],
+            to_attr='latest_reviews',
+        ),
+        'availability',
+        'images',
+        'pricing_tiers',
+    )
+
+
+def with_all_services(queryset, services):
+    """
+    Keep daycares tagged with every requested service. Resolved as a single
+    grouped lookup on the (tag, daycare) index instead of one LIKE per service.
+    """
+    slugs = {slugify(service) for service in services} - {''}
+    if not slugs:
+        return queryset
+    matching = DaycareServiceTag.objects.filter(tag__slug__in=slugs).values('daycare').annotate(
+        matched=Count('tag')
+    ).filter(matched=len(slugs)).values('daycare')
+    return queryset.filter(id__in=matching)
+
+
+def service_tag_facets(daycares=None):
+    """ServiceTags used by the given (default: all verified) daycares, with per-tag counts."""
+    daycares = daycares if daycares is not None else verified_daycares()
+    return ServiceTag.objects.filter(
+        daycare_links__daycare__in=daycares.values('id')
+    ).annotate(
+        daycare_count=Count('daycare_links')
+    ).order_by('-daycare_count', 'name')
+
+
+def today_weekday():
+    return timezone.now().strftime('%A').lower()
+
+
+def with_available_slots(queryset, day=None):
+    """
+    Annotate ``today_available_slots`` for ``day`` (default today) via LEFT JOINs:
+    capacity - used from the DaycareOccupancy ledger when that date has a row,
+    else max_capacity - current_bookings for its weekday, else 0.
+    """
+    day = day or timezone.now().date()
+    return queryset.annotate(
+        today_occupancy=FilteredRelation(
+            'occupancy',
+            condition=Q(occupancy__date=day),
+        ),
+        today_availability=FilteredRelation(
+            'availability',
+            condition=Q(availability__day_of_week=day.strftime('%A').lower()),
+        ),
+        today_available_slots=Coalesce(
+            Greatest(
+                Coalesce(
+                    F('today_occupancy__capacity') - F('today_occupancy__used'),
+                    F('today_availability__max_capacity') - F('today_availability__current_bookings'),
+                ),
+                Value(0),
+            ),
+            Value(0),
+        ),
+    )
+
+
+def with_price(queryset, frequency):
+    """
+    Annotate ``price`` / ``price_max``: the cheapest and dearest active tier for
+    ``frequency``, from DaycarePriceSummary (one indexed LEFT JOIN; NULL when the
+    daycare has no such tier).
+    """
+    return queryset.annotate(
+        frequency_price=FilteredRelation(
+            'price_summaries',
+            condition=Q(price_summaries__frequency=frequency),
+        ),
+        price=F('frequency_price__min_price'),
+        price_max=F('frequency_price__max_price'),
+    )
+
+
+def with_distance(queryset, latitude, longitude):
+    """Annotate ``distance`` (km) from the given point; NULL for daycares without coordinates."""
+    return queryset.annotate(distance=distance_expression(latitude, longitude))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Daycares within radius_km, pre-filtered on the (grid_lat, grid_lng) index."""
+    (lat_lo, lat_hi), (lng_lo, lng_hi) = bounding_cells(latitude, longitude, radius_km)
+    queryset = queryset.filter(
+        grid_lat__range=(lat_lo, lat_hi),
+        grid_lng__range=(lng_lo, lng_hi),
+    )
+    return with_distance(queryset, latitude, longitude).filter(distance__lte=radius_km)
+
+
+def nearest(queryset, latitude, longitude, k, max_radius_km):
+    """
+    The k daycares closest to the point (within max_radius_km), nearest first.
+
+    Grows the search circle until it holds k daycares: once a circle of radius
+    r contains k rows, nothing outside it can be closer than those k.
+    """
+    radius_km = min(NEAREST_START_RADIUS_KM, max_radius_km)
+    while True:
+        rows = list(within_radius(queryset, latitude, longitude, radius_km).order_by('distance')[:k])
+        if len(rows) >= k or radius_km >= max_radius_km:
+            return rows
+        radius_km = min(radius_km * 2, max_radius_km)
+
+
+def with_booking_relations(queryset):
+    """
+    Join what BookingSerializer renders (daycare, child, emergency contact)
+    and annotate ``has_review`` so can_review needs no per-row lookup.
+    """
+    return queryset.select_related('daycare', 'child', 'emergency_contact').annotate(
+        has_review=Exists(BookingReview.objects.filter(booking=OuterRef('pk')))
+    )
+
+
+def with_parent_profiles(queryset):
+    """
+    Prefetch each booking's parent with everything ParentProfileSerializer
+    renders (user, address, emergency contact, children). Parents are
+    fetched once per distinct id, however many bookings share them.
+    """
+    return queryset.prefetch_related(Prefetch(
+        'parent',
+        queryset=Parent.objects.select_related('user', 'address', 'emergency_contact').prefetch_related('children'),
+    ))
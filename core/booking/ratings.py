@@ -0,0 +1,65 @@
+"""
+Review aggregates stored on DaycareCenter.
+
+Search, listing and detail endpoints read ``DaycareCenter.rating`` and
+friends instead of aggregating ``BookingReview`` rows per request. The
+columns are refreshed whenever a review is saved or deleted, and can be
+rebuilt in bulk with ``manage.py rebuild_daycare_aggregates``.
+"""
+from django.db.models import Avg, Count
+
+from users.models import DaycareCenter
+from .models import BookingReview
+
+# DaycareCenter column -> BookingReview column it averages
+ASPECT_FIELDS = {
+    'avg_cleanliness_rating': 'cleanliness_rating',
+    'avg_staff_rating': 'staff_rating',
+    'avg_communication_rating': 'communication_rating',
+    'avg_value_rating': 'value_rating',
+}
+
+AGGREGATE_FIELDS = ['rating', 'review_count', *ASPECT_FIELDS]
+
+
+def _aggregates():
+    return {
+        'rating': Avg('rating'),
+        'review_count': Count('id'),
+        **{field: Avg(source) for field, source in ASPECT_FIELDS.items()},
+    }
+
+
+def _column_values(stats):
+    values = {
+        'rating': stats['rating'] or 0.0,
+        'review_count': stats['review_count'] or 0,
+    }
+    for field in ASPECT_FIELDS:
+        values[field] = stats[field]
+    return values
+
+
+def refresh_daycare_rating(daycare_id):
+    """Recompute the review aggregates of a single daycare."""
+    stats = BookingReview.objects.filter(
+        daycare_id=daycare_id, is_approved=True
+    ).aggregate(**_aggregates())
+    DaycareCenter.objects.filter(pk=daycare_id).update(**_column_values(stats))
+
+
+def rebuild_all_ratings(batch_size=500):
+    """Recompute the review aggregates of every daycare. Returns the number updated."""
+    grouped = BookingReview.objects.filter(is_approved=True).values('daycare').annotate(
+        **_aggregates()
+    ).order_by()
+    stats_by_daycare = {row['daycare']: row for row in grouped}
+    empty = {field: None for field in AGGREGATE_FIELDS}
+
+    daycares = list(DaycareCenter.objects.only('id', *AGGREGATE_FIELDS))
+    for daycare in daycares:
+        values = _column_values(stats_by_daycare.get(daycare.id, empty))
+        for field, value in values.items():
+            setattr(daycare, field, value)
+    DaycareCenter.objects.bulk_update(daycares, AGGREGATE_FIELDS, batch_size=batch_size)
+    return len(daycares)
@@ -0,0 +1,96 @@
+"""
+Daily booking rollups for the dashboards.
+
+DaycareDailyStats and ParentDailyStats hold, per (daycare, day) and
+(parent, day), the number of bookings created that day, how many of them
+are in each status, what they have paid and how many distinct children
+they cover. Whenever a booking is written (saved, deleted, moved through a
+transition, bulk created) ``refresh`` recomputes the rows for that
+booking's daycare and parent on its creation day from the (daycare,
+created_at) / (parent, created_at) indexes, inside the writer's
+transaction. ``rebuild_all`` (``manage.py rebuild_booking_rollups``)
+recreates every row from scratch.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+from .models import Booking, DaycareDailyStats, ParentDailyStats
+
+STATUS_FIELDS = [status for status, _ in Booking.STATUS_CHOICES]
+STAT_FIELDS = ['bookings', *STATUS_FIELDS, 'revenue', 'children']
+# Rollup model per owner column on Booking
+ROLLUPS = {'daycare': DaycareDailyStats, 'parent': ParentDailyStats}
+
+
+def _aggregates():
+    return {
+        'bookings': Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in STATUS_FIELDS},
+        'revenue': Coalesce(Sum('paid_amount'), Value(Decimal('0')), output_field=DecimalField()),
+        'children': Count('child', distinct=True),
+    }
+
+
+def _grouped(bookings, owner):
+    return bookings.annotate(day=TruncDate('created_at')).values(f'{owner}_id', 'day').annotate(
+        **_aggregates()
+    ).order_by()
+
+
+def _rollup(owner, row):
+    return ROLLUPS[owner](
+        date=row['day'], **{f'{owner}_id': row[f'{owner}_id']},
+        **{field: row[field] for field in STAT_FIELDS},
+    )
+
+
+def _day_range(day):
+    start = datetime.combine(day, time.min)
+    return {'created_at__gte': start, 'created_at__lt': start + timedelta(days=1)}
+
+
+@transaction.atomic
+def refresh(keys):
+    """Recompute the rollup rows for each (daycare_id, parent_id, creation date) in ``keys``."""
+    wanted = defaultdict(set)
+    for daycare_id, parent_id, day in keys:
+        wanted['daycare'].add((daycare_id, day))
+        wanted['parent'].add((parent_id, day))
+
+    for owner, rows in wanted.items():
+        model = ROLLUPS[owner]
+        condition = Q(pk__in=[])
+        for owner_id, day in rows:
+            condition |= Q(**{f'{owner}_id': owner_id}, **_day_range(day))
+        fresh = [_rollup(owner, row) for row in _grouped(Booking.objects.filter(condition), owner)]
+        model.objects.bulk_create(
+            fresh, update_conflicts=True, unique_fields=[owner, 'date'], update_fields=STAT_FIELDS
+        )
+        # A day whose last booking was deleted drops its row
+        emptied = rows - {(getattr(stats, f'{owner}_id'), stats.date) for stats in fresh}
+        if emptied:
+            stale = Q(pk__in=[])
+            for owner_id, day in emptied:
+                stale |= Q(**{f'{owner}_id': owner_id}, date=day)
+            model.objects.filter(stale).delete()
+
+
+def refresh_bookings(bookings):
+    refresh([(booking.daycare_id, booking.parent_id, booking.created_at.date()) for booking in bookings])
+
+
+def rebuild_all(batch_size=500):
+    """Recreate every rollup row. Returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        for owner, model in ROLLUPS.items():
+            model.objects.all().delete()
+            rollups = [_rollup(owner, row) for row in _grouped(Booking.objects.all(), owner)]
+            model.objects.bulk_create(rollups, batch_size=batch_size)
+            written += len(rollups)
+    return written
@@ -0,0 +1,174 @@
+"""
+Full-text search over DaycareCenter.
+
+SQLite uses an FTS5 virtual table ranked with bm25(); PostgreSQL uses a
+tsvector side table with a GIN index ranked with ts_rank(). Both are
+created by migration 0007 and kept in sync from DaycareCenter post_save /
+post_delete. On any other database search falls back to DRF's icontains
+lookups.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from users.models import DaycareCenter
+
+SQLITE_TABLE = 'booking_daycare_fts'
+POSTGRES_TABLE = 'booking_daycare_search'
+INDEXED_FIELDS = ('name', 'address', 'services', 'description')
+
+# Column weights, in INDEXED_FIELDS order: a hit in the name matters most.
+SQLITE_WEIGHTS = (10.0, 2.0, 4.0, 1.0)
+POSTGRES_WEIGHTS = ('A', 'C', 'B', 'D')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+DAYCARE_PK = f'{DaycareCenter._meta.db_table}.{DaycareCenter._meta.pk.column}'
+
+
+def tokenize(terms):
+    tokens = []
+    for term in terms:
+        tokens.extend(token.lower() for token in TOKEN_RE.findall(term))
+    return tokens
+
+
+class SQLiteFullTextBackend:
+
+    def index(self, daycare):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [daycare.pk])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, {", ".join(INDEXED_FIELDS)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(INDEXED_FIELDS))})',
+                [daycare.pk, *(getattr(daycare, field) or '' for field in INDEXED_FIELDS)],
+            )
+
+    def remove(self, daycare_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [daycare_id])
+
+    def rebuild(self):
+        columns = ', '.join(INDEXED_FIELDS)
+        source = ', '.join(f"COALESCE({field}, '')" for field in INDEXED_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, {columns}) '
+                f'SELECT id, {source} FROM {DaycareCenter._meta.db_table}'
+            )
+
+    def search(self, queryset, tokens):
+        # Every token is quoted (so user input can't inject FTS syntax) and
+        # prefix-matched, since the search box queries on each keystroke.
+        # bm25() is only available inside the MATCH query itself, hence the
+        # join through extra() rather than a correlated subquery. Relevance
+        # is an annotation (not an extra select) so keyset pagination can
+        # filter on it.
+        match = ' '.join('"%s"*' % token for token in tokens)
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        return queryset.extra(
+            tables=[SQLITE_TABLE],
+            where=[f'{SQLITE_TABLE} MATCH %s', f'{SQLITE_TABLE}.rowid = {DAYCARE_PK}'],
+            params=[match],
+        ).annotate(
+            relevance=RawSQL(f'-bm25({SQLITE_TABLE}, {weights})', [], output_field=FloatField())
+        )
+
+
+class PostgresFullTextBackend:
+
+    def _document_sql(self):
+        return ' || '.join(
+            f"setweight(to_tsvector('simple', COALESCE(%s, '')), '{weight}')"
+            for weight in POSTGRES_WEIGHTS
+        )
+
+    def index(self, daycare):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {POSTGRES_TABLE} (daycare_id, document) '
+                f'VALUES (%s, {self._document_sql()}) '
+                f'ON CONFLICT (daycare_id) DO UPDATE SET document = EXCLUDED.document',
+                [daycare.pk, *(getattr(daycare, field) for field in INDEXED_FIELDS)],
+            )
+
+    def remove(self, daycare_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {POSTGRES_TABLE} WHERE daycare_id = %s', [daycare_id])
+
+    def rebuild(self):
+        document = ' || '.join(
+            f"setweight(to_tsvector('simple', COALESCE({field}, '')), '{weight}')"
+            for field, weight in zip(INDEXED_FIELDS, POSTGRES_WEIGHTS)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {POSTGRES_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {POSTGRES_TABLE} (daycare_id, document) '
+                f'SELECT id, {document} FROM {DaycareCenter._meta.db_table}'
+            )
+
+    def search(self, queryset, tokens):
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.extra(
+            tables=[POSTGRES_TABLE],
+            where=[
+                f"{POSTGRES_TABLE}.document @@ to_tsquery('simple', %s)",
+                f'{POSTGRES_TABLE}.daycare_id = {DAYCARE_PK}',
+            ],
+            params=[query],
+        ).annotate(
+            relevance=RawSQL(
+                f"ts_rank({POSTGRES_TABLE}.document, to_tsquery('simple', %s))",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteFullTextBackend,
+    'postgresql': PostgresFullTextBackend,
+}
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def index_daycare(daycare):
+    backend = get_backend()
+    if backend:
+        backend.index(daycare)
+
+
+def remove_daycare(daycare_id):
+    backend = get_backend()
+    if backend:
+        backend.remove(daycare_id)
+
+
+def rebuild_index():
+    backend = get_backend()
+    if backend:
+        backend.rebuild()
+    return backend is not None
+
+
+class DaycareFullTextFilter(filters.SearchFilter):
+    """
+    SearchFilter that matches through the full-text index and annotates a
+    ``relevance`` score (higher is better) for ``?ordering=-relevance``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        tokens = tokenize(self.get_search_terms(request))
+        backend = get_backend()
+        if tokens and backend:
+            return backend.search(queryset, tokens)
+        queryset = super().filter_queryset(request, queryset, view)
+        return queryset.annotate(relevance=Value(0.0, output_field=FloatField()))
@@ -1,13 +1,15 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 from .models import (
     Booking, BookingReview, BookingMessage, 
-    DaycareAvailability, BookingPayment, DaycarePricing
+    DaycareAvailability, BookingPayment, DaycarePricing, DaycarePriceSummary
 )
-from users.models import DaycareCenter, Child, Parent
+from .occupancy import HOLDING_STATUSES, CapacityError, release_places, reserve_places
+from users.models import DaycareCenter, Child, Parent, ServiceTag, EmergencyContact
 # from users.serializers import ChildSerializer
 
 # booking/serializers.py (or relevant file)
@@ -34,37 +36,49 @@ class DaycarePricingSerializer(serializers.ModelSerializer):
                 print("DEBUG DaycarePricingSerializer.to_internal_value: Validation Error for single tier:", e.detail)
                 raise  # Re-raise the error so DRF reports it properly
 
+class ServiceTagSerializer(serializers.ModelSerializer):
+    """Normalised service tag; daycare_count is present on facet listings"""
+    daycare_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ServiceTag
+        fields = ['id', 'name', 'slug', 'daycare_count']
+
+
 class DaycareSearchSerializer(serializers.ModelSerializer):
     """Serializer for daycare search results"""
     area_display = serializers.SerializerMethodField()
+    service_tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
     rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
     available_slots = serializers.SerializerMethodField()
     main_image_url = serializers.SerializerMethodField()
     distance = serializers.SerializerMethodField()
+    price_from = serializers.SerializerMethodField()
+    price_to = serializers.SerializerMethodField()
     
     class Meta:
         model = DaycareCenter
         fields = [
             'id', 'name', 'address', 'area', 'area_display', 'phone', 
-            'rating', 'review_count', 'services', 'description',
-            'main_image_url', 'available_slots', 'distance', 'created_at'
+            'rating', 'review_count', 'services', 'service_tags', 'description',
+            'main_image_url', 'available_slots', 'latitude', 'longitude', 'distance',
+            'price_from', 'price_to', 'created_at'
         ]
     
     def get_area_display(self, obj):
         return obj.get_area_display() if obj.area else ""
     
     def get_rating(self, obj):
-        avg_rating = obj.reviews.filter(is_approved=True).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating']
-        return round(avg_rating, 1) if avg_rating else 0.0
+        return round(obj.rating, 1) if obj.review_count else 0.0
     
     def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        return obj.review_count
     
     def get_available_slots(self, obj):
-        # Calculate available slots based on current day
+        # Annotated by booking.queries.with_available_slots on list endpoints
+        if hasattr(obj, 'today_available_slots'):
+            return obj.today_available_slots
         today = timezone.now().strftime('%A').lower()
         try:
             availability = obj.availability.get(day_of_week=today)
@@ -80,17 +94,28 @@ class DaycareSearchSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
+    def get_price_from(self, obj):
+        # Annotated by booking.queries.with_price on the search endpoint
+        price = getattr(obj, 'price', None)
+        return str(price) if price is not None else None
+    
+    def get_price_to(self, obj):
+        price = getattr(obj, 'price_max', None)
+        return str(price) if price is not None else None
+    
     def get_distance(self, obj):
-        # Placeholder for distance calculation
-        # In a real implementation, you'd calculate based on user's location
-        return None
+        # Annotated (km) by booking.queries.with_distance when an origin is given
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 2) if distance is not None else None
 
 
 class DaycareDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for individual daycare view"""
     area_display = serializers.SerializerMethodField()
+    service_tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
     rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
+    rating_breakdown = serializers.SerializerMethodField()
     reviews = serializers.SerializerMethodField()
     availability = serializers.SerializerMethodField()
     main_image_url = serializers.SerializerMethodField()
@@ -100,8 +125,8 @@ class DaycareDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = DaycareCenter
         fields = [
-            'id', 'name', 'address', 'area', 'area_display', 'phone', 
-            'rating', 'review_count', 'services', 'description',
+            'id', 'name', 'address', 'area', 'area_display', 'phone', 'latitude', 'longitude',
+            'rating', 'review_count', 'rating_breakdown', 'services', 'service_tags', 'description',
             'main_image_url', 'images', 'reviews', 'availability', 'pricing_tiers',
             'created_at'
         ]
@@ -110,20 +135,32 @@ class DaycareDetailSerializer(serializers.ModelSerializer):
         return obj.get_area_display() if obj.area else ""
     
     def get_rating(self, obj):
-        avg_rating = obj.reviews.filter(is_approved=True).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating']
-        return round(avg_rating, 1) if avg_rating else 0.0
+        return round(obj.rating, 1) if obj.review_count else 0.0
     
     def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        return obj.review_count
+    
+    def get_rating_breakdown(self, obj):
+        def rounded(value):
+            return round(value, 1) if value is not None else None
+        return {
+            'cleanliness': rounded(obj.avg_cleanliness_rating),
+            'staff': rounded(obj.avg_staff_rating),
+            'communication': rounded(obj.avg_communication_rating),
+            'value': rounded(obj.avg_value_rating),
+        }
     
     def get_reviews(self, obj):
-        reviews = obj.reviews.filter(is_approved=True).order_by('-created_at')[:5]
+        # Prefetched by booking.queries.with_detail_relations on the detail endpoint
+        if hasattr(obj, 'latest_reviews'):
+            reviews = obj.latest_reviews
+        else:
+            reviews = obj.reviews.filter(is_approved=True).select_related('parent').order_by('-created_at')[:5]
         return BookingReviewSerializer(reviews, many=True, context=self.context).data
     
     def get_availability(self, obj):
-        availability = obj.availability.all().order_by('day_of_week')
+        # Meta.ordering is day_of_week; .all() reuses the prefetched rows
+        availability = obj.availability.all()
         return DaycareAvailabilitySerializer(availability, many=True).data
     
     def get_main_image_url(self, obj):
@@ -146,8 +183,34 @@ class DaycareDetailSerializer(serializers.ModelSerializer):
         return image_urls
 
 
+class DaycareComparisonSerializer(DaycareDetailSerializer):
+    """Detail payload plus today's open slots, for side-by-side comparison"""
+    # Annotated by booking.queries.with_available_slots
+    available_slots = serializers.IntegerField(source='today_available_slots', read_only=True)
+
+    class Meta(DaycareDetailSerializer.Meta):
+        fields = DaycareDetailSerializer.Meta.fields + ['available_slots']
+
+
+def booking_end_date(booking_type, start_date):
+    """Monthly care runs 30 days, daily care one."""
+    if booking_type == 'monthly':
+        return start_date + timedelta(days=30)
+    return start_date + timedelta(days=1)
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new bookings"""
+    # Ownership/verification checks below read these without further queries
+    daycare = serializers.PrimaryKeyRelatedField(queryset=DaycareCenter.objects.select_related('user'))
+    child = serializers.PrimaryKeyRelatedField(queryset=Child.objects.only('id', 'parent'))
+    emergency_contact = serializers.PrimaryKeyRelatedField(queryset=EmergencyContact.objects.only('id', 'parent'))
+    
+    # Fallback rates when the daycare has no active tier for the booking type
+    DEFAULT_RATES = {
+        'monthly': 8000,
+        'daily': 300,
+    }
     
     class Meta:
         model = Booking
@@ -161,11 +224,11 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         parent = self.context['request'].user.parent_profile
         
         # Validate child belongs to parent
-        if data['child'].parent != parent:
+        if data['child'].parent_id != parent.id:
             raise serializers.ValidationError("Child does not belong to this parent.")
         
         # Validate emergency contact belongs to parent
-        if data['emergency_contact'].parent != parent:
+        if data['emergency_contact'].parent_id != parent.id:
             raise serializers.ValidationError("Emergency contact does not belong to this parent.")
         
         # Validate dates
@@ -176,67 +239,77 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         if not data['daycare'].user.is_verified:
             raise serializers.ValidationError("This daycare is not verified yet.")
         
-        # Calculate end_date based on booking_type
-        if data['booking_type'] == 'monthly':
-            end_date = data['start_date'] + timedelta(days=30)
-        else:  # daily care
-            end_date = data['start_date'] + timedelta(days=1)
-        
-        # Check for overlapping bookings
-        overlapping_bookings = Booking.objects.filter(
-            child=data['child'],
-            status__in=['pending', 'confirmed', 'active'],
-            start_date__lte=end_date,
-            end_date__gte=data['start_date']
-        )
-        
-        if overlapping_bookings.exists():
-            raise serializers.ValidationError("Child already has a booking during this period.")
-        
-        data['end_date'] = end_date
+        # The overlap check runs in create(), under the child's row lock
+        data['end_date'] = booking_end_date(data['booking_type'], data['start_date'])
         return data
     
     def create(self, validated_data):
         parent = self.context['request'].user.parent_profile
-        
-        # Calculate total amount based on daycare pricing
         daycare = validated_data['daycare']
+        child = validated_data['child']
         booking_type = validated_data['booking_type']
         
-        try:
-            # Match booking_type with frequency ('monthly' -> 'Monthly', 'daily' -> 'Daily')
-            frequency_mapping = {
-                'monthly': 'Monthly',
-                'daily': 'Daily',
-            }
-            frequency = frequency_mapping.get(booking_type)
-            
-            pricing = DaycarePricing.objects.get(daycare=daycare, frequency=frequency, is_active=True)
-            total_amount = pricing.price
-        except DaycarePricing.DoesNotExist:
-            # Default pricing if not set
-            default_rates = {
-                'monthly': 8000,
-                'daily': 300,
-            }
-            total_amount = default_rates.get(booking_type, 8000)
+        # Cheapest active tier for the booking type ('monthly' -> 'Monthly', 'daily' -> 'Daily')
+        summary = DaycarePriceSummary.objects.filter(
+            daycare=daycare, frequency=booking_type.capitalize()
+        ).values_list('min_price', flat=True).first()
+        total_amount = summary if summary is not None else self.DEFAULT_RATES.get(booking_type, 8000)
         
-        # Calculate end_date
-        if booking_type == 'monthly':
-            end_date = validated_data['start_date'] + timedelta(days=30)
-        else:  # daily care
-            end_date = validated_data['start_date'] + timedelta(days=1)
-        
-        # Create booking
-        booking = Booking.objects.create(
-            parent=parent,
-            total_amount=total_amount,
-            **validated_data
-        )
+        try:
+            with transaction.atomic():
+                # Serialise bookings per child so two concurrent requests can't both
+                # pass the overlap check (backed by the child/status/dates index)
+                Child.objects.select_for_update().only('id').get(pk=child.pk)
+                overlapping = Booking.objects.filter(
+                    child=child,
+                    status__in=HOLDING_STATUSES,
+                    start_date__lte=validated_data['end_date'],
+                    end_date__gte=validated_data['start_date']
+                )
+                if overlapping.exists():
+                    raise serializers.ValidationError("Child already has a booking during this period.")
+                
+                # Hold a place on every booked day in the same transaction as the booking
+                closed_dates = reserve_places(daycare.id, validated_data['start_date'], validated_data['end_date'])
+                booking = Booking.objects.create(
+                    parent=parent,
+                    total_amount=total_amount,
+                    closed_dates=closed_dates,
+                    **validated_data
+                )
+        except CapacityError as exc:
+            raise serializers.ValidationError({
+                'non_field_errors': [str(exc)],
+                'full_dates': [day.isoformat() for day in exc.full_dates],
+            })
         
         return booking
 
 
+class BookingBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One entry of a bulk create request. Related objects stay as ids here;
+    bulk_bookings.create_bookings resolves and checks them for the whole batch.
+    """
+    daycare = serializers.IntegerField()
+    child = serializers.IntegerField()
+    emergency_contact = serializers.IntegerField()
+
+    class Meta:
+        model = Booking
+        fields = [
+            'daycare', 'child', 'booking_type', 'start_date',
+            'start_time', 'end_time', 'special_instructions',
+            'emergency_contact', 'payment_method'
+        ]
+
+    def validate(self, data):
+        if data['start_date'] < timezone.now().date():
+            raise serializers.ValidationError("Start date cannot be in the past.")
+        data['end_date'] = booking_end_date(data['booking_type'], data['start_date'])
+        return data
+
+
 class BookingSerializer(serializers.ModelSerializer):
     
     daycare_name = serializers.CharField(source='daycare.name', read_only=True)
@@ -276,11 +349,33 @@ class BookingSerializer(serializers.ModelSerializer):
         return None
     
     def get_can_cancel(self, obj):
-        return obj.can_be_cancelled()
+        # One clock reading per response, shared by every row of a page
+        return obj.can_be_cancelled(now=self.context.setdefault('now', timezone.now()))
     
     def get_can_review(self, obj):
-        return (obj.status == 'completed' and 
-                not hasattr(obj, 'review'))
+        if obj.status != 'completed':
+            return False
+        # with_booking_relations() annotates has_review; fall back to the reverse lookup
+        has_review = getattr(obj, 'has_review', None)
+        return not (hasattr(obj, 'review') if has_review is None else has_review)
+
+
+class DaycareBookingSerializer(BookingSerializer):
+    """Booking row for the daycare's list, with the parent's profile embedded"""
+    parent_profile = serializers.SerializerMethodField()
+
+    class Meta(BookingSerializer.Meta):
+        fields = BookingSerializer.Meta.fields + ['parent_profile']
+
+    def get_parent_profile(self, obj):
+        # users.serializers imports this module, so import it here
+        from users.serializers import ParentProfileSerializer
+
+        # A parent with several bookings on the page is serialized once
+        profiles = self.context.setdefault('parent_profiles', {})
+        if obj.parent_id not in profiles:
+            profiles[obj.parent_id] = ParentProfileSerializer(obj.parent, context=self.context).data
+        return profiles[obj.parent_id]
 
 
 class BookingUpdateSerializer(serializers.ModelSerializer):
@@ -313,15 +408,37 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
         return data
     
     def update(self, instance, validated_data):
-        # Update end_date if start_date changes
-        if 'start_date' in validated_data:
-            new_start_date = validated_data['start_date']
-            if instance.booking_type == 'monthly':
-                instance.end_date = new_start_date + timedelta(days=30)
-            else:  # daily care
-                instance.end_date = new_start_date + timedelta(days=30)
+        start_date = validated_data.get('start_date', instance.start_date)
+        if start_date == instance.start_date:
+            return super().update(instance, validated_data)
         
-        return super().update(instance, validated_data)
+        end_date = booking_end_date(instance.booking_type, start_date)
+        try:
+            with transaction.atomic():
+                # Re-read under a lock so the places released are the ones the
+                # booking actually holds, then move them to the new dates
+                current = Booking.objects.select_for_update().get(pk=instance.pk)
+                if current.status != 'pending':
+                    raise serializers.ValidationError("Only pending bookings can be updated.")
+                Child.objects.select_for_update().only('id').get(pk=current.child_id)
+                overlapping = Booking.objects.filter(
+                    child_id=current.child_id,
+                    status__in=HOLDING_STATUSES,
+                    start_date__lte=end_date,
+                    end_date__gte=start_date
+                ).exclude(pk=current.pk)
+                if overlapping.exists():
+                    raise serializers.ValidationError("Child already has a booking during this period.")
+                
+                release_places(current)
+                instance.closed_dates = reserve_places(current.daycare_id, start_date, end_date)
+                instance.end_date = end_date
+                return super().update(instance, validated_data)
+        except CapacityError as exc:
+            raise serializers.ValidationError({
+                'non_field_errors': [str(exc)],
+                'full_dates': [day.isoformat() for day in exc.full_dates],
+            })
 
 
 class BookingCancelSerializer(serializers.Serializer):
@@ -0,0 +1,112 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from users.models import DaycareCenter, DaycareImage, User
+from . import autocomplete
+from .analytics import mark_history_stale, mark_parent_stats_stale
+from .availability_matrix import mark_matrix_stale
+from .leaderboard import mark_leaderboard_stale
+from .listing_cache import mark_daycare_stale, mark_listing_stale
+from .models import Booking, BookingReview, DaycareAvailability, DaycarePricing
+from .occupancy import HOLDING_STATUSES, release_places, sync_capacity
+from .pricing import refresh_price_summary
+from .ratings import refresh_daycare_rating
+from .rollups import refresh_bookings
+from .search import index_daycare, remove_daycare
+from .transitions import booking_transitioned
+
+
+@receiver(post_save, sender=BookingReview)
+@receiver(post_delete, sender=BookingReview)
+def review_changed(sender, instance, **kwargs):
+    """Keep DaycareCenter.rating/review_count in step with approved reviews."""
+    refresh_daycare_rating(instance.daycare_id)
+    mark_leaderboard_stale()
+    mark_listing_stale()
+    mark_daycare_stale(instance.daycare_id)
+    mark_history_stale(instance.daycare_id)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        refresh_bookings([instance])
+    if created:
+        mark_leaderboard_stale()
+    mark_history_stale(instance.daycare_id)
+    mark_parent_stats_stale(instance.parent_id)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    # Completed bookings keep their (past) places, so deleting one gives them back too
+    if instance.status in HOLDING_STATUSES or instance.status == 'completed':
+        release_places(instance)
+    refresh_bookings([instance])
+    mark_history_stale(instance.daycare_id)
+    mark_parent_stats_stale(instance.parent_id)
+
+
+@receiver(booking_transitioned)
+def booking_status_changed(sender, event, **kwargs):
+    mark_history_stale(event.daycare_id)
+    mark_parent_stats_stale(event.parent_id)
+
+
+@receiver(post_save, sender=DaycareCenter)
+def daycare_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        index_daycare(instance)
+        autocomplete.update_daycare(instance.pk)
+        if created:
+            mark_matrix_stale()
+    mark_listing_stale()
+    mark_daycare_stale(instance.pk)
+
+
+@receiver(post_delete, sender=DaycareCenter)
+def daycare_deleted(sender, instance, **kwargs):
+    remove_daycare(instance.pk)
+    autocomplete.remove_daycare(instance.pk)
+    mark_matrix_stale()
+    mark_listing_stale()
+
+
+@receiver(post_save, sender=DaycareAvailability)
+def availability_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_capacity(instance)
+        mark_matrix_stale()
+
+
+@receiver(post_delete, sender=DaycareAvailability)
+def availability_deleted(sender, instance, **kwargs):
+    mark_matrix_stale()
+
+
+@receiver(post_save, sender=DaycareImage)
+@receiver(post_delete, sender=DaycareImage)
+@receiver(post_save, sender=DaycareAvailability)
+@receiver(post_delete, sender=DaycareAvailability)
+def listing_row_changed(sender, instance, **kwargs):
+    mark_listing_stale()
+    mark_daycare_stale(instance.daycare_id)
+
+
+@receiver(post_save, sender=DaycarePricing)
+@receiver(post_delete, sender=DaycarePricing)
+def pricing_changed(sender, instance, **kwargs):
+    """Keep DaycarePriceSummary in step with the daycare's active tiers."""
+    refresh_price_summary(instance.daycare_id)
+    mark_daycare_stale(instance.daycare_id)
+
+
+@receiver(post_save, sender=User)
+def daycare_user_saved(sender, instance, **kwargs):
+    # Verification flags decide whether a daycare is listed at all
+    if instance.user_type == 'daycare':
+        mark_listing_stale()
+        mark_matrix_stale()
+        for daycare_id in DaycareCenter.objects.filter(user=instance).values_list('id', flat=True):
+            mark_daycare_stale(daycare_id)
+            autocomplete.update_daycare(daycare_id)
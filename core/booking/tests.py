@@ -1,3 +1,1114 @@
-from django.test import TestCase
+import base64
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import (
+    User, Parent, Child, EmergencyContact, DaycareCenter, DaycareServiceTag, ServiceTag, Address
+)
+from users.serializers import UpdateDaycareProfileSerializer
+from .models import (
+    Booking, BookingReview, DaycareAvailability, DaycareDailyStats, DaycareOccupancy, DaycarePricing,
+    ParentDailyStats,
+)
+from .analytics import default_range
+from .queries import today_weekday
+from .caching import bump_version, single_flight
+from .lifecycle import advance_lifecycle
+from .occupancy import CapacityError
+from .rollups import rebuild_all
+from .transitions import DAYCARE_ACTIONS, booking_transitioned, transition_booking
+
+
+class BookingTestMixin:
+    """Shared fixtures: one verified daycare, one parent with a child."""
+
+    def setUp(self):
+        cache.clear()
+        self.daycare_user = User.objects.create_user(
+            email='daycare@example.com', password='pass12345', user_type='daycare',
+            is_verified=True, is_email_verified=True
+        )
+        self.daycare = DaycareCenter.objects.create(
+            user=self.daycare_user, name='Happy Kids', address='Road 1',
+            area='gulshan', phone='01700000000', services='Meals, Transport'
+        )
+        self.parent_user = User.objects.create_user(
+            email='parent@example.com', password='pass12345', user_type='parent',
+            is_email_verified=True
+        )
+        self.parent = Parent.objects.create(user=self.parent_user, full_name='Parent One')
+        self.child = Child.objects.create(
+            parent=self.parent, full_name='Kid One', date_of_birth=date(2021, 1, 1), gender='male'
+        )
+        self.contact = EmergencyContact.objects.create(
+            parent=self.parent, full_name='Contact', relationship='spouse', phone_primary='01711111111'
+        )
+
+    def make_daycare(self, name, **extra):
+        user = User.objects.create_user(
+            email=f'{name.lower().replace(" ", "")}@example.com', password='pass12345',
+            user_type='daycare', is_verified=True, is_email_verified=True
+        )
+        defaults = {'address': 'Road 2', 'area': 'banani', 'phone': '01700000001', 'services': ''}
+        defaults.update(extra)
+        return DaycareCenter.objects.create(user=user, name=name, **defaults)
+
+    def make_booking(self, daycare=None, start=None, status='pending', **extra):
+        return Booking.objects.create(
+            parent=self.parent, daycare=daycare or self.daycare, child=self.child,
+            booking_type=extra.pop('booking_type', 'daily'),
+            start_date=start or date.today() + timedelta(days=3),
+            status=status, total_amount=extra.pop('total_amount', 300),
+            emergency_contact=self.contact, **extra
+        )
+
+    def make_availability(self, daycare=None, max_capacity=30, current_bookings=0):
+        return DaycareAvailability.objects.create(
+            daycare=daycare or self.daycare, day_of_week=today_weekday(), opening_time=time(8),
+            closing_time=time(18), max_capacity=max_capacity, current_bookings=current_bookings
+        )
+
+    def make_review(self, booking, rating, **extra):
+        return BookingReview.objects.create(
+            booking=booking, parent=self.parent, daycare=booking.daycare,
+            rating=rating, comment='Good', **extra
+        )
+
+
+class RatingAggregateTests(BookingTestMixin, APITestCase):
+
+    def test_review_changes_update_daycare_aggregates(self):
+        first = self.make_review(self.make_booking(status='completed'), 5, staff_rating=4)
+        self.make_review(self.make_booking(status='completed', start=date.today() + timedelta(days=10)), 3)
+
+        self.daycare.refresh_from_db()
+        self.assertEqual(self.daycare.review_count, 2)
+        self.assertEqual(self.daycare.rating, 4.0)
+        self.assertEqual(self.daycare.avg_staff_rating, 4.0)
+
+        first.is_approved = False
+        first.save()
+        self.daycare.refresh_from_db()
+        self.assertEqual(self.daycare.review_count, 1)
+        self.assertEqual(self.daycare.rating, 3.0)
+
+    def test_profile_update_keeps_aggregates_written_meanwhile(self):
+        stale = DaycareCenter.objects.get(pk=self.daycare.pk)
+        self.make_review(self.make_booking(status='completed'), 5, staff_rating=4)
+
+        serializer = UpdateDaycareProfileSerializer(stale, data={'description': 'Now open late'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.daycare.refresh_from_db()
+        self.assertEqual(self.daycare.description, 'Now open late')
+        self.assertEqual(self.daycare.review_count, 1)
+        self.assertEqual(self.daycare.rating, 5.0)
+        self.assertEqual(self.daycare.avg_staff_rating, 4.0)
+
+    def test_search_min_rating_uses_stored_rating(self):
+        self.make_review(self.make_booking(status='completed'), 5)
+        other = self.make_daycare('Little Stars')
+        self.make_review(self.make_booking(daycare=other, status='completed',
+                                           start=date.today() + timedelta(days=10)), 2)
+
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.get(reverse('daycare-search'), {'min_rating': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d['id'] for d in response.data['results']], [self.daycare.id])
+        self.assertEqual(response.data['results'][0]['rating'], 5.0)
+        self.assertEqual(response.data['results'][0]['review_count'], 1)
+
+
+class AvailabilitySearchTests(BookingTestMixin, APITestCase):
+
+    def test_has_availability_and_slots_in_constant_queries(self):
+        self.make_availability(self.daycare, 10, 4)
+        full = self.make_daycare('Full House')
+        self.make_availability(full, 5, 5)
+        for i in range(3):
+            self.make_availability(self.make_daycare(f'Open {i}'), 8, 1)
+
+        self.client.force_authenticate(self.parent_user)
+        self.client.get(reverse('daycare-search'), {'has_availability': 'true'})  # caches the facets
+        with self.assertNumQueries(2):  # daycares + prefetched service tags
+            response = self.client.get(reverse('daycare-search'), {'has_availability': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        slots = {d['id']: d['available_slots'] for d in response.data['results']}
+        self.assertNotIn(full.id, slots)
+        self.assertEqual(slots[self.daycare.id], 6)
+        self.assertEqual(len(slots), 4)
+
+
+class FullTextSearchTests(BookingTestMixin, APITestCase):
+
+    def test_search_matches_prefixes_and_ranks_by_relevance(self):
+        self.make_daycare('Garden Kids', description='Small rooms')
+        self.make_daycare('Blue Sky', description='Overlooks a garden')
+        for i in range(4):
+            self.make_daycare(f'Filler {i}', description='Nothing relevant')
+
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.get(reverse('daycare-search'), {'search': 'gard'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d['name'] for d in response.data['results']], ['Blue Sky', 'Garden Kids'])
+
+        response = self.client.get(reverse('daycare-search'), {'search': 'gard', 'ordering': '-relevance'})
+        self.assertEqual([d['name'] for d in response.data['results']], ['Garden Kids', 'Blue Sky'])
+
+        response = self.client.get(reverse('daycare-search'), {'search': 'garden blue'})
+        self.assertEqual([d['name'] for d in response.data['results']], ['Blue Sky'])
+
+    def test_index_follows_daycare_edits(self):
+        self.daycare.name = 'Rainbow Nest'
+        self.daycare.save()
+
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.get(reverse('daycare-search'), {'search': 'rainbow'})
+        self.assertEqual([d['id'] for d in response.data['results']], [self.daycare.id])
+        response = self.client.get(reverse('daycare-search'), {'search': 'happy "kids'})
+        self.assertEqual(response.data['results'], [])
+
+
+class ServiceTagTests(BookingTestMixin, APITestCase):
+
+    def test_tags_follow_services_text(self):
+        self.assertEqual(
+            sorted(self.daycare.service_tags.values_list('slug', flat=True)), ['meals', 'transport']
+        )
+        self.daycare.services = 'Meals,  Outdoor play'
+        self.daycare.featured_services = 'Outdoor Play'
+        self.daycare.save()
+        links = {link.tag.slug: link.is_featured for link in self.daycare.service_tag_links.all()}
+        self.assertEqual(links, {'meals': False, 'outdoor-play': True})
+        self.assertEqual(ServiceTag.objects.filter(slug='outdoor-play').count(), 1)
+
+    def test_services_filter_requires_every_tag(self):
+        self.make_daycare('Only Meals', services='meals')
+        self.client.force_authenticate(self.parent_user)
+
+        response = self.client.get(reverse('daycare-search'), {'services': 'Meals, transport'})
+        self.assertEqual([d['id'] for d in response.data['results']], [self.daycare.id])
+        self.assertEqual(response.data['results'][0]['service_tags'], ['Meals', 'Transport'])
+
+        response = self.client.get(reverse('daycare-service-facets'))
+        counts = {tag['slug']: tag['daycare_count'] for tag in response.data}
+        self.assertEqual(counts, {'meals': 2, 'transport': 1})
+
+
+class GeoSearchTests(BookingTestMixin, APITestCase):
+    # Gulshan 1 circle, Dhaka
+    ORIGIN = (23.7806, 90.4193)
+
+    def setUp(self):
+        super().setUp()
+        self.daycare.latitude, self.daycare.longitude = 23.7925, 90.4078  # ~1.8 km
+        self.daycare.save()
+        self.near = self.make_daycare('Banani Tots', latitude=23.7937, longitude=90.4066)  # ~1.9 km
+        self.far = self.make_daycare('Uttara Kids', latitude=23.8759, longitude=90.3795)  # ~11 km
+        self.make_daycare('No Coordinates')
+        Address.objects.create(parent=self.parent, area='gulshan',
+                               latitude=self.ORIGIN[0], longitude=self.ORIGIN[1])
+        self.client.force_authenticate(self.parent_user)
+
+    def test_grid_cell_follows_coordinates(self):
+        self.assertIsNotNone(self.far.grid_lat)
+        self.far.latitude = None
+        self.far.save(update_fields=['latitude'])
+        self.far.refresh_from_db()
+        self.assertIsNone(self.far.grid_lat)
+
+    def test_nearby_returns_k_nearest_with_distance(self):
+        response = self.client.get(reverse('nearby-daycares'), {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['daycares']
+        self.assertEqual([d['id'] for d in rows], [self.daycare.id, self.near.id])
+        self.assertAlmostEqual(rows[0]['distance'], 1.76, delta=0.05)
+
+        response = self.client.get(reverse('nearby-daycares'), {'limit': 5})
+        self.assertEqual(len(response.data['daycares']), 3)
+
+    def test_nearby_radius_and_search_distance_ordering(self):
+        response = self.client.get(reverse('nearby-daycares'), {'radius_km': 5})
+        self.assertEqual({d['id'] for d in response.data['daycares']}, {self.daycare.id, self.near.id})
+
+        lat, lng = self.ORIGIN
+        response = self.client.get(reverse('daycare-search'), {
+            'lat': lat, 'lng': lng, 'radius_km': 20, 'ordering': '-distance'
+        })
+        self.assertEqual([d['id'] for d in response.data['results']], [self.far.id, self.near.id, self.daycare.id])
+
+
+class PopularLeaderboardTests(BookingTestMixin, APITestCase):
+
+    def test_popular_serves_snapshot_until_stale(self):
+        other = self.make_daycare('Little Stars')
+        self.make_booking(daycare=other)
+        self.make_booking(daycare=other, start=date.today() + timedelta(days=10))
+        self.make_booking()
+
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.get(reverse('popular-daycares'))
+        self.assertEqual([d['id'] for d in response.data], [other.id, self.daycare.id])
+
+        with self.assertNumQueries(2):  # daycares + service tags; the ranking is cached
+            self.client.get(reverse('popular-daycares'))
+
+    def test_single_flight_serves_stale_value_while_rebuilding(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(single_flight('test:key', build, 60, version_name='test'), 1)
+        bump_version('test')
+        cache.add('test:key:rebuilding', 1)  # another worker is mid-rebuild
+        self.assertEqual(single_flight('test:key', build, 60, version_name='test'), 1)
+        cache.delete('test:key:rebuilding')
+        self.assertEqual(single_flight('test:key', build, 60, version_name='test'), 2)
+        self.assertEqual(single_flight('test:key', build, 60, version_name='test'), 2)
+
+
+class KeysetPaginationTests(BookingTestMixin, APITestCase):
+
+    def test_booking_pages_follow_cursor_without_gaps(self):
+        bookings = [self.make_booking(start=date.today() + timedelta(days=3 * i)) for i in range(5)]
+        # Identical timestamps exercise the id tie-breaker
+        Booking.objects.update(created_at=bookings[0].created_at)
+
+        self.client.force_authenticate(self.parent_user)
+        url = reverse('booking-list') + '?page_size=2&include_total=true'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['total'], 5)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            # created_at and id are NOT NULL: the cursor stays a plain range seek
+            self.assertFalse(any('IS NULL' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(seen, sorted((b.id for b in bookings), reverse=True))
+
+    def test_nullable_ordering_and_bad_cursor(self):
+        for i in range(3):
+            self.make_daycare(f'Near {i}', latitude=23.78 + i / 100, longitude=90.41)
+        self.client.force_authenticate(self.parent_user)
+
+        url = reverse('daycare-search') + '?lat=23.78&lng=90.41&ordering=distance&page_size=1'
+        names = []
+        while url:
+            response = self.client.get(url)
+            names.extend(row['name'] for row in response.data['results'])
+            url = response.data['next']
+        # Daycares without coordinates sort last
+        self.assertEqual(names, ['Near 0', 'Near 1', 'Near 2', 'Happy Kids'])
+
+        response = self.client.get(reverse('daycare-search'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # Decodes fine, but the values don't fit (-created_at, pk)
+        for values in (b'[1,2]', b'["abc",1]'):
+            cursor = base64.urlsafe_b64encode(values).decode().rstrip('=')
+            response = self.client.get(reverse('booking-list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PublicListingCacheTests(BookingTestMixin, APITestCase):
+
+    def test_conditional_get_and_invalidation(self):
+        url = reverse('public-daycare-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertEqual(response.json()['results'][0]['name'], 'Happy Kids')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.make_availability(max_capacity=8)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['available_slots'], 8)
+
+
+class DaycareDetailTests(BookingTestMixin, APITestCase):
+
+    def test_detail_in_fixed_queries_and_cached_per_daycare(self):
+        for i in range(3):
+            booking = self.make_booking(start=date.today() - timedelta(days=10 + i), status='completed')
+            self.make_review(booking, 4 + i % 2, is_approved=True)
+        self.make_availability()
+        other = self.make_daycare('Little Stars')
+        self.client.force_authenticate(self.parent_user)
+        url = reverse('daycare-detail', args=[self.daycare.id])
+
+        # daycare, service tags, reviews (+parent), availability, images, pricing
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['reviews']), 3)
+        self.assertEqual(response.data['reviews'][0]['parent_name'], 'Parent One')
+        self.assertEqual(len(response.data['availability']), 1)
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        # Another daycare's edit leaves this payload cached; an own child row refreshes it
+        other.save()
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        DaycarePricing.objects.create(daycare=self.daycare, name='Full day', price=500)
+        response = self.client.get(url)
+        self.assertEqual([tier['name'] for tier in response.data['pricing_tiers']], ['Full day'])
+
+
+class DaycareBatchTests(BookingTestMixin, APITestCase):
+
+    def test_batch_returns_requested_daycares_in_fixed_queries(self):
+        others = [self.make_daycare(f'Center {i}') for i in range(4)]
+        for daycare in others:
+            self.make_availability(daycare, max_capacity=10, current_bookings=3)
+            DaycarePricing.objects.create(daycare=daycare, name='Monthly', price=4000)
+        self.client.force_authenticate(self.parent_user)
+        ids = [others[2].id, self.daycare.id, others[0].id, 9999]
+
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('daycare-batch'), {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d['id'] for d in response.data['results']], ids[:3])
+        self.assertEqual(response.data['missing'], [9999])
+        first = response.data['results'][0]
+        self.assertEqual(first['available_slots'], 7)
+        self.assertEqual(first['pricing_tiers'][0]['price'], '4000.00')
+
+    def test_batch_rejects_bad_or_oversized_lists(self):
+        self.client.force_authenticate(self.parent_user)
+        url = reverse('daycare-batch')
+        self.assertEqual(self.client.get(url, {'ids': '1,x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(DAYCARE_BATCH_MAX_IDS=2):
+            response = self.client.get(url, {'ids': '1,2,3'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AutocompleteTests(BookingTestMixin, APITestCase):
+
+    def suggest(self, query):
+        response = self.client.get(reverse('daycare-autocomplete'), {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(s['type'], s['label']) for s in response.data['suggestions']]
+
+    def test_prefix_word_and_typo_matches_without_queries(self):
+        self.make_daycare('Happy Hearts Montessori', area='gulshan', services='Montessori')
+        self.make_daycare('Sunrise Kids', area='mirpur')
+        self.suggest('a')  # build the index
+
+        with self.assertNumQueries(0):
+            labels = self.suggest('hap')
+        # Equal weight: the shorter (closer) label first
+        self.assertEqual(labels, [('daycare', 'Happy Kids'), ('daycare', 'Happy Hearts Montessori')])
+        self.assertIn(('daycare', 'Sunrise Kids'), self.suggest('kid'))
+        self.assertEqual(self.suggest('gul'), [('area', 'Gulshan')])
+        self.assertIn(('service', 'Montessori'), self.suggest('montes'))
+        self.assertEqual(self.suggest('sunrize')[0], ('daycare', 'Sunrise Kids'))
+
+    def test_index_follows_daycare_changes(self):
+        self.suggest('a')
+        self.daycare.name = 'Bright Beginnings'
+        self.daycare.save()
+        self.assertEqual(self.suggest('brig'), [('daycare', 'Bright Beginnings')])
+        self.assertEqual(self.suggest('happy'), [])
+
+        self.daycare_user.is_verified = False
+        self.daycare_user.save()
+        self.assertEqual(self.suggest('brig'), [])
+
+
+class SearchFacetTests(BookingTestMixin, APITestCase):
+
+    def test_facets_count_filtered_results_in_two_queries(self):
+        DaycarePricing.objects.create(daycare=self.daycare, name='Monthly', price=8000)
+        rated = self.make_daycare('Little Stars', area='gulshan', services='Meals')
+        DaycarePricing.objects.create(daycare=rated, name='Monthly', price=3000)
+        DaycareCenter.objects.filter(pk=rated.pk).update(rating=4.5, review_count=2)
+        self.make_daycare('Far Away', area='uttara', services='Transport')
+        self.client.force_authenticate(self.parent_user)
+
+        # page + service tags, then the facet aggregate + the per-tag GROUP BY
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('daycare-search'), {'area': 'gulshan'})
+        facets = response.data['facets']
+        self.assertEqual(facets['total'], 2)
+        areas = {f['value']: f['count'] for f in facets['areas']}
+        self.assertEqual((areas['gulshan'], areas['uttara']), (2, 0))
+        self.assertEqual({f['value']: f['count'] for f in facets['ratings']}['4+'], 1)
+        prices = {f['value']: f['count'] for f in facets['prices']}
+        self.assertEqual((prices['under_5000'], prices['5000_10000']), (1, 1))
+        self.assertEqual(facets['services'], [
+            {'value': 'meals', 'label': 'Meals', 'count': 2},
+            {'value': 'transport', 'label': 'Transport', 'count': 1},
+        ])
+
+        # Re-sorting the same filter set reuses the cached block
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('daycare-search'), {'area': 'gulshan', 'ordering': 'name'})
+        self.assertEqual(response.data['facets']['total'], 2)
+
+        page = self.client.get(reverse('daycare-search'), {'area': 'gulshan', 'page_size': 1})
+        self.assertNotIn('facets', self.client.get(page.data['next']).data)
+
+    def test_service_facets_scale_past_the_column_limit(self):
+        tags = ServiceTag.objects.bulk_create(ServiceTag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(2100))
+        DaycareServiceTag.objects.bulk_create(DaycareServiceTag(daycare=self.daycare, tag=tag) for tag in tags)
+        other = self.make_daycare('Little Stars')
+        DaycareServiceTag.objects.create(daycare=other, tag=tags[-1])
+        self.client.force_authenticate(self.parent_user)
+        with self.settings(SEARCH_SERVICE_FACET_LIMIT=3):
+            response = self.client.get(reverse('daycare-search'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Most used first, then by name
+        self.assertEqual([(s['value'], s['count']) for s in response.data['facets']['services']],
+                         [('tag-2099', 2), ('meals', 1), ('tag-0', 1)])
+
+
+class PriceSearchTests(BookingTestMixin, APITestCase):
+
+    def test_summary_follows_tier_updates(self):
+        self.client.force_authenticate(self.daycare_user)
+        response = self.client.post(reverse('daycare-pricing-update'), {'pricing_tiers': [
+            {'name': 'Half day', 'price': '6000', 'frequency': 'Monthly'},
+            {'name': 'Full day', 'price': '9000', 'frequency': 'Monthly'},
+            {'name': 'Drop in', 'price': '500', 'frequency': 'Daily'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summaries = {s.frequency: (s.min_price, s.max_price) for s in self.daycare.price_summaries.all()}
+        self.assertEqual(summaries, {'Monthly': (6000, 9000), 'Daily': (500, 500)})
+
+        DaycarePricing.objects.filter(daycare=self.daycare, frequency='Daily').delete()
+        DaycarePricing.objects.get(name='Half day').delete()
+        summaries = {s.frequency: (s.min_price, s.max_price) for s in self.daycare.price_summaries.all()}
+        self.assertEqual(summaries, {'Monthly': (9000, 9000)})
+
+    def test_profile_update_rejects_duplicate_tiers(self):
+        DaycarePricing.objects.create(daycare=self.daycare, name='Full day', price=9000)
+        self.client.force_authenticate(self.daycare_user)
+        response = self.client.put(reverse('update-daycare-profile'), {'pricing_tiers': [
+            {'name': 'Full day', 'price': '9000', 'frequency': 'Monthly'},
+            {'name': 'Full day', 'price': '9500', 'frequency': 'Monthly'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pricing_tiers', response.data)
+        self.assertEqual(list(self.daycare.pricing_tiers.values_list('price', flat=True)), [9000])
+
+    def test_price_filters_and_ordering(self):
+        DaycarePricing.objects.create(daycare=self.daycare, name='Standard', price=8000)
+        cheap = self.make_daycare('Budget Care')
+        DaycarePricing.objects.create(daycare=cheap, name='Standard', price=4000)
+        DaycarePricing.objects.create(daycare=cheap, name='Daily', price=300, frequency='Daily')
+        self.make_daycare('No Prices')
+        self.client.force_authenticate(self.parent_user)
+        url = reverse('daycare-search')
+
+        response = self.client.get(url, {'ordering': 'price'})
+        self.assertEqual([d['name'] for d in response.data['results']], ['Budget Care', 'Happy Kids', 'No Prices'])
+        self.assertEqual(response.data['results'][0]['price_from'], '4000.00')
+
+        response = self.client.get(url, {'max_price': 5000})
+        self.assertEqual([d['name'] for d in response.data['results']], ['Budget Care'])
+        response = self.client.get(url, {'min_price': 5000, 'ordering': '-price'})
+        self.assertEqual([d['name'] for d in response.data['results']], ['Happy Kids'])
+        # Daily tiers only; an unparsable bound is ignored
+        response = self.client.get(url, {'price_frequency': 'daily', 'max_price': 'abc', 'ordering': 'price'})
+        self.assertEqual([d['price_from'] for d in response.data['results']], ['300.00', None, None])
+
+
+class OccupancyLedgerTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_child = Child.objects.create(
+            parent=self.parent, full_name='Kid Two', date_of_birth=date(2022, 1, 1), gender='female'
+        )
+
+    def book(self, child, start):
+        return self.client.post(reverse('booking-create'), {
+            'daycare': self.daycare.id, 'child': child.id, 'booking_type': 'daily',
+            'start_date': start.isoformat(), 'emergency_contact': self.contact.id,
+        })
+
+    def test_capacity_is_reserved_and_released(self):
+        today = date.today()
+        self.make_availability(max_capacity=1)  # today's weekday only
+        self.client.force_authenticate(self.parent_user)
+
+        self.assertEqual(self.book(self.child, today).status_code, status.HTTP_201_CREATED)
+        ledger = DaycareOccupancy.objects.get(daycare=self.daycare, date=today)
+        self.assertEqual((ledger.capacity, ledger.used), (1, 1))
+        response = self.client.get(reverse('public-daycare-list'))
+        self.assertEqual(response.json()['results'][0]['available_slots'], 0)
+
+        response = self.book(self.other_child, today)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['full_dates'], [today.isoformat()])
+        self.assertEqual(Booking.objects.count(), 1)
+
+        # The daycare declines the first booking, which frees the place
+        self.client.force_authenticate(self.daycare_user)
+        booking = Booking.objects.get()
+        response = self.client.post(reverse('daycare-booking-decline', args=[booking.id]), {'reason': 'Full'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Booking.objects.get().status, 'rejected')
+        self.client.force_authenticate(self.parent_user)
+        self.assertEqual(self.book(self.other_child, today).status_code, status.HTTP_201_CREATED)
+
+    def test_parent_cancel_releases_every_booked_day(self):
+        start = date.today() + timedelta(days=7)
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.post(reverse('booking-create'), {
+            'daycare': self.daycare.id, 'child': self.child.id, 'booking_type': 'monthly',
+            'start_date': start.isoformat(), 'emergency_contact': self.contact.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ledger = DaycareOccupancy.objects.filter(daycare=self.daycare)
+        self.assertEqual(ledger.filter(used=1).count(), 30)
+
+        booking = Booking.objects.get()
+        response = self.client.post(
+            reverse('booking-cancel', args=[booking.id]), {'cancellation_reason': 'Moving'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(ledger.filter(used__gt=0).exists())
+        response = self.client.post(
+            reverse('booking-cancel', args=[booking.id]), {'cancellation_reason': 'Again'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_skips_days_that_were_closed_when_booked(self):
+        closed_day = date.today() + timedelta(days=7)  # same weekday as the availability row
+        availability = self.make_availability(max_capacity=0)
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.post(reverse('booking-create'), {
+            'daycare': self.daycare.id, 'child': self.child.id, 'booking_type': 'monthly',
+            'start_date': (date.today() + timedelta(days=2)).isoformat(), 'emergency_contact': self.contact.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        first = Booking.objects.get()
+        self.assertIn(closed_day.isoformat(), first.closed_dates)
+
+        # The day reopens and another booking takes a place on it
+        availability.max_capacity = 5
+        availability.save()
+        self.assertEqual(self.book(self.other_child, closed_day).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(reverse('booking-cancel', args=[first.id]), {'cancellation_reason': 'Moving'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(DaycareOccupancy.objects.get(date=closed_day).used, 1)
+        self.assertEqual(DaycareOccupancy.objects.filter(used__gt=0).count(), 1)
+
+    def test_date_change_moves_places_and_delete_releases_them(self):
+        start = date.today() + timedelta(days=7)
+        self.client.force_authenticate(self.parent_user)
+        self.assertEqual(self.book(self.child, start).status_code, status.HTTP_201_CREATED)
+        booking = Booking.objects.get()
+        ledger = DaycareOccupancy.objects.filter(daycare=self.daycare)
+
+        moved = start + timedelta(days=3)
+        response = self.client.patch(reverse('booking-update', args=[booking.id]), {'start_date': moved.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(ledger.filter(used=1).values_list('date', flat=True)), [moved])
+        self.assertEqual(Booking.objects.get().end_date, moved + timedelta(days=1))
+
+        Booking.objects.get().delete()
+        self.assertFalse(ledger.filter(used__gt=0).exists())
+
+
+class DateRangeAvailabilityTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.sunday = self.monday + timedelta(days=6)
+
+    def search(self, **params):
+        params = {'available_from': self.monday.isoformat(), 'available_to': self.sunday.isoformat(), **params}
+        response = self.client.get(reverse('daycare-search'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(d['name'] for d in response.data['results'])
+
+    def test_range_search_uses_weekday_capacity_and_ledger(self):
+        closed_midweek = self.make_daycare('Closed Wednesdays')
+        DaycareAvailability.objects.create(
+            daycare=closed_midweek, day_of_week='wednesday', is_available=False,
+            opening_time=time(8), closing_time=time(18)
+        )
+        weekdays_only = self.make_daycare('Weekdays Only')
+        for day in ('saturday', 'sunday'):
+            DaycareAvailability.objects.create(
+                daycare=weekdays_only, day_of_week=day, is_available=False,
+                opening_time=time(8), closing_time=time(18)
+            )
+        tiny = self.make_daycare('Tiny Tots')
+        DaycareAvailability.objects.create(
+            daycare=tiny, day_of_week='tuesday', max_capacity=1,
+            opening_time=time(8), closing_time=time(18)
+        )
+        self.client.force_authenticate(self.parent_user)
+
+        self.assertEqual(self.search(), ['Happy Kids', 'Tiny Tots', 'Weekdays Only'])
+        self.assertEqual(self.search(include_weekends='true'), ['Happy Kids', 'Tiny Tots'])
+
+        # Booking Tiny Tots' only Tuesday place patches the matrix in place
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('booking-create'), {
+                'daycare': tiny.id, 'child': self.child.id, 'booking_type': 'daily',
+                'start_date': (self.monday + timedelta(days=1)).isoformat(),
+                'emergency_contact': self.contact.id,
+            })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.search(), ['Happy Kids', 'Weekdays Only'])
+        self.assertEqual(
+            self.search(available_to=self.monday.isoformat()),
+            ['Closed Wednesdays', 'Happy Kids', 'Tiny Tots', 'Weekdays Only'],
+        )
+
+    def test_range_outside_horizon_or_in_the_past_is_rejected(self):
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.get(reverse('daycare-search'), {
+            'available_from': self.monday.isoformat(),
+            'available_to': (self.monday + timedelta(days=400)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('daycare-search'), {'available_from': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        past = date.today() - timedelta(days=10)
+        response = self.client.get(reverse('daycare-search'), {
+            'available_from': past.isoformat(), 'available_to': (past + timedelta(days=3)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookingCreateTests(BookingTestMixin, APITestCase):
+
+    def payload(self, start, **extra):
+        return {
+            'daycare': self.daycare.id, 'child': self.child.id, 'booking_type': 'daily',
+            'start_date': start.isoformat(), 'emergency_contact': self.contact.id, **extra
+        }
+
+    def test_create_in_fixed_queries_and_rejects_overlap(self):
+        DaycarePricing.objects.create(daycare=self.daycare, name='Drop in', price=450, frequency='Daily')
+        DaycarePricing.objects.create(daycare=self.daycare, name='Drop in plus', price=600, frequency='Daily')
+        start = date.today() + timedelta(days=5)
+        self.client.force_authenticate(self.parent_user)
+
+        # daycare+user, child, contact | price, child lock, overlap |
+        # availability, ledger insert, full-day check, reserve | booking insert |
+        # rollup refresh: daycare select/upsert, parent select/upsert
+        with self.assertNumQueries(15 + 6):  # + savepoints around the nested atomic blocks
+            response = self.client.post(reverse('booking-create'), self.payload(start))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.get().total_amount, 450)
+
+        response = self.client.post(reverse('booking-create'), self.payload(start))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(DaycareOccupancy.objects.get(date=start).used, 1)
+
+    def test_foreign_child_is_rejected(self):
+        other_parent = Parent.objects.create(
+            user=User.objects.create_user(email='other@example.com', password='pass12345', user_type='parent'),
+            full_name='Other'
+        )
+        foreign = Child.objects.create(
+            parent=other_parent, full_name='Kid', date_of_birth=date(2021, 1, 1), gender='male'
+        )
+        self.client.force_authenticate(self.parent_user)
+        response = self.client.post(
+            reverse('booking-create'), self.payload(date.today() + timedelta(days=5), child=foreign.id)
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkBookingCreateTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.second_child = Child.objects.create(
+            parent=self.parent, full_name='Kid Two', date_of_birth=date(2022, 1, 1), gender='female'
+        )
+        self.client.force_authenticate(self.parent_user)
+
+    def entry(self, start, child=None, **extra):
+        return {
+            'daycare': self.daycare.id, 'child': (child or self.child).id, 'booking_type': 'daily',
+            'start_date': start.isoformat(), 'emergency_contact': self.contact.id, **extra
+        }
+
+    def post(self, entries, **extra):
+        return self.client.post(
+            reverse('booking-bulk-create'), {'bookings': entries, **extra}, format='json'
+        )
+
+    def test_batch_is_created_in_fixed_queries(self):
+        DaycarePricing.objects.create(daycare=self.daycare, name='Drop in', price=450, frequency='Daily')
+        start = date.today() + timedelta(days=5)
+        entries = [
+            self.entry(start), self.entry(start, self.second_child),
+            self.entry(start + timedelta(days=3)), self.entry(start + timedelta(days=10), booking_type='monthly'),
+        ]
+
+        # daycares, children, contacts, prices | child locks, overlaps |
+        # availability, ledger insert, ledger read, 2 reserves (1 and 2 places) | booking insert |
+        # rollup refresh: daycare select/upsert, parent select/upsert
+        with self.assertNumQueries(16 + 6):  # + savepoints around the nested atomic blocks
+            response = self.post(entries)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(Booking.objects.filter(booking_type='daily', total_amount=450).count(), 3)
+        self.assertEqual(Booking.objects.get(booking_type='monthly').total_amount, 8000)
+        self.assertEqual(DaycareOccupancy.objects.get(date=start).used, 2)
+
+    def test_atomic_batch_writes_nothing_when_one_entry_fails(self):
+        start = date.today() + timedelta(days=5)
+        response = self.post([self.entry(start), self.entry(start + timedelta(days=1))])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([result['status'] for result in response.data['results']], ['skipped', 'failed'])
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(DaycareOccupancy.objects.filter(used__gt=0).exists())
+
+    def test_best_effort_creates_the_entries_that_fit(self):
+        self.make_availability(max_capacity=1)
+        start = date.today() + timedelta(days=7)  # same weekday as the availability row
+        response = self.post(
+            [self.entry(start), self.entry(start, self.second_child), self.entry(start, child=Child(id=0))],
+            mode='best_effort'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'failed', 'failed'])
+        self.assertEqual(response.data['results'][1]['errors']['full_dates'], [start.isoformat()])
+        self.assertEqual(Booking.objects.get().child, self.child)
+        self.assertEqual(DaycareOccupancy.objects.get(date=start).used, 1)
+
+    def test_day_filling_up_concurrently_fails_entries_instead_of_erroring(self):
+        start = date.today() + timedelta(days=5)
+        entries = [self.entry(start), self.entry(start, self.second_child)]
+        race = CapacityError("The daycare is fully booked on some of the requested dates.")
+
+        with mock.patch('booking.bulk_bookings.reserve_many', side_effect=race):
+            response = self.post(entries)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([result['status'] for result in response.data['results']], ['failed', 'failed'])
+        self.assertFalse(Booking.objects.exists())
+
+        # Best effort re-reads the ledger once and creates what still fits
+        with mock.patch('booking.bulk_bookings.reserve_many', side_effect=[race, ([None, race], [[], []])]):
+            response = self.post(entries, mode='best_effort')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'failed'])
+
+
+class BulkTransitionTests(BookingTestMixin, APITestCase):
+
+    def test_bulk_decline_skips_foreign_and_settled_bookings(self):
+        start = date.today() + timedelta(days=5)
+        self.client.force_authenticate(self.parent_user)
+        self.client.post(reverse('booking-bulk-create'), {'bookings': [
+            {'daycare': self.daycare.id, 'child': self.child.id, 'booking_type': 'daily',
+             'start_date': (start + timedelta(days=offset)).isoformat(), 'emergency_contact': self.contact.id}
+            for offset in (0, 2, 4)
+        ]}, format='json')
+        first, second, third = Booking.objects.order_by('start_date')
+        Booking.objects.filter(pk=third.pk).update(status='confirmed')
+        foreign = self.make_booking(daycare=self.make_daycare('Other Place'))
+
+        self.client.force_authenticate(self.daycare_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('daycare-booking-bulk'), {
+                'action': 'decline', 'ids': [first.id, second.id, third.id, foreign.id], 'reason': 'Full'
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['transitioned']), [first.id, second.id])
+        self.assertEqual(response.data['skipped'], [third.id, foreign.id])
+        self.assertEqual(Booking.objects.filter(status='rejected', cancellation_reason='Full').count(), 2)
+        self.assertEqual(Booking.objects.get(pk=foreign.pk).status, 'pending')
+        self.assertEqual(
+            list(DaycareOccupancy.objects.filter(daycare=self.daycare).order_by('date').values_list('used', flat=True)),
+            [0, 0, 1]
+        )
+
+    def test_unknown_action_is_rejected(self):
+        self.client.force_authenticate(self.daycare_user)
+        response = self.client.post(reverse('daycare-booking-bulk'), {'action': 'delete', 'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookingTransitionTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.events = []
+        booking_transitioned.connect(self.record_event)
+        self.addCleanup(booking_transitioned.disconnect, self.record_event)
+
+    def record_event(self, sender, event, **kwargs):
+        self.events.append(event)
+
+    def test_accept_is_a_single_conditional_update(self):
+        booking = self.make_booking()
+        self.client.force_authenticate(self.daycare_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('daycare-booking-accept', args=[booking.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['booking']['status'], 'confirmed')
+        self.assertEqual([(event.booking_id, event.action, event.status) for event in self.events],
+                         [(booking.id, 'accept', 'confirmed')])
+
+        response = self.client.post(reverse('daycare-booking-accept', args=[booking.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(self.events), 1)
+
+    def test_losing_a_race_does_not_release_places_twice(self):
+        start = date.today() + timedelta(days=5)
+        self.client.force_authenticate(self.parent_user)
+        self.client.post(reverse('booking-create'), {
+            'daycare': self.daycare.id, 'child': self.child.id, 'booking_type': 'daily',
+            'start_date': start.isoformat(), 'emergency_contact': self.contact.id
+        })
+        booking = Booking.objects.get()
+        Booking.objects.create(
+            parent=self.parent, daycare=self.daycare, child=Child.objects.create(
+                parent=self.parent, full_name='Kid Two', date_of_birth=date(2022, 1, 1), gender='female'
+            ), booking_type='daily', start_date=start, total_amount=300, emergency_contact=self.contact
+        )
+        DaycareOccupancy.objects.filter(date=start).update(used=2)
+
+        self.client.force_authenticate(self.daycare_user)
+        self.client.post(reverse('daycare-cancel-booking', args=[booking.id]))
+        response = self.client.post(reverse('daycare-cancel-booking', args=[booking.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DaycareOccupancy.objects.get(date=start).used, 1)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).cancelled_by, 'daycare')
+
+
+class BookingLifecycleTests(BookingTestMixin, APITestCase):
+
+    def test_lifecycle_moves_due_bookings_in_chunks(self):
+        today = date.today()
+        unanswered = self.make_booking(start=today - timedelta(days=1))
+        starting = self.make_booking(start=today, status='confirmed', booking_type='monthly')
+        ended = [self.make_booking(start=today - timedelta(days=offset), status='active') for offset in (3, 5, 7)]
+        upcoming = self.make_booking(start=today + timedelta(days=3), status='confirmed')
+        DaycareOccupancy.objects.create(daycare=self.daycare, date=unanswered.start_date, capacity=30, used=1)
+
+        moved, finished = advance_lifecycle(batch_size=2)
+
+        self.assertTrue(finished)
+        self.assertEqual(moved, {'expire': 1, 'activate': 1, 'complete': 3})
+        statuses = dict(Booking.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[unanswered.pk], 'expired')
+        self.assertEqual(statuses[starting.pk], 'active')
+        self.assertEqual({statuses[booking.pk] for booking in ended}, {'completed'})
+        self.assertEqual(statuses[upcoming.pk], 'confirmed')
+        self.assertEqual(DaycareOccupancy.objects.get(date=unanswered.start_date).used, 0)
+
+        # A second run finds nothing left to do
+        self.assertEqual(advance_lifecycle()[0], {'expire': 0, 'activate': 0, 'complete': 0})
+
+    def test_run_stops_at_the_time_limit(self):
+        self.make_booking(start=date.today(), status='confirmed')
+        moved, finished = advance_lifecycle(max_seconds=0)
+        self.assertFalse(finished)
+        self.assertEqual(Booking.objects.get().status, 'confirmed')
+
+
+class BookingListQueryTests(BookingTestMixin, APITestCase):
+
+    def test_page_of_bookings_serializes_in_constant_queries(self):
+        start = date.today() + timedelta(days=3)
+        Booking.objects.bulk_create([
+            Booking(
+                parent=self.parent, daycare=self.daycare, child=self.child, booking_type='daily',
+                start_date=start + timedelta(days=offset), end_date=start + timedelta(days=offset + 1),
+                status='completed' if offset % 2 else 'pending', total_amount=300,
+                emergency_contact=self.contact
+            )
+            for offset in range(100)
+        ])
+        reviewed = Booking.objects.filter(status='completed').order_by('start_date').first()
+        self.make_review(reviewed, 5)
+        self.client.force_authenticate(self.parent_user)
+
+        with self.assertNumQueries(1):  # the page, with joins and the review EXISTS
+            response = self.client.get(reverse('booking-list'), {'page_size': 100})
+
+        rows = {row['id']: row for row in response.data['results']}
+        self.assertEqual(len(rows), 100)
+        self.assertFalse(rows[reviewed.id]['can_review'])
+        self.assertEqual(sum(row['can_review'] for row in rows.values()), 49)
+        self.assertEqual(rows[reviewed.id]['emergency_contact_name'], 'Contact')
+        self.assertEqual(sum(row['can_cancel'] for row in rows.values()), 50)
+
+
+class DaycareBookingListTests(BookingTestMixin, APITestCase):
+
+    def test_parent_profiles_are_prefetched_once_per_parent(self):
+        Address.objects.create(parent=self.parent, street_address='Road 5', city='Dhaka', area='gulshan')
+        for offset in range(10):
+            self.make_booking(start=date.today() + timedelta(days=3 + 2 * offset))
+        other = Parent.objects.create(
+            user=User.objects.create_user(email='other@example.com', password='pass12345', user_type='parent'),
+            full_name='Parent Two'
+        )
+        other_child = Child.objects.create(
+            parent=other, full_name='Kid Three', date_of_birth=date(2020, 5, 1), gender='male'
+        )
+        Booking.objects.create(
+            parent=other, daycare=self.daycare, child=other_child, booking_type='daily',
+            start_date=date.today() + timedelta(days=4), total_amount=300
+        )
+        self.client.force_authenticate(self.daycare_user)
+
+        # page | parents with user, address and contact | their children
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('daycare-booking-list'))
+
+        rows = response.data['results']
+        self.assertEqual(len(rows), 11)
+        profiles = {row['parent_profile']['full_name']: row['parent_profile'] for row in rows}
+        self.assertEqual(profiles['Parent One']['address']['city'], 'Dhaka')
+        self.assertEqual([child['full_name'] for child in profiles['Parent One']['children']], ['Kid One'])
+        self.assertEqual(profiles['Parent One']['emergency_contact']['full_name'], 'Contact')
+        self.assertIsNone(profiles['Parent Two']['emergency_contact'])
+
+
+class DaycareHistoryTests(BookingTestMixin, APITestCase):
+
+    def test_history_is_aggregated_in_a_few_queries_and_cached(self):
+        completed = self.make_booking(status='completed', paid_amount=300)
+        self.make_review(completed, 4)
+        self.make_booking(start=date.today() + timedelta(days=10), booking_type='monthly')
+        self.client.force_authenticate(self.daycare_user)
+        url = reverse('daycare-booking-history')
+
+        with self.assertNumQueries(4):  # rows with reviews, months, frequent parents, totals
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row['id']: row for row in response.data['booking_history']}
+        self.assertEqual((rows[completed.id]['rating'], rows[completed.id]['review']), (4, 'Good'))
+        self.assertEqual(len(response.data['monthly_summary']), 6)
+        this_month = response.data['monthly_summary'][-1]
+        self.assertEqual((this_month['bookings'], this_month['amount_earned']), (2, 300))
+        self.assertEqual(response.data['total_children_served'], 1)
+        self.assertEqual(response.data['average_booking_duration'], 16.5)  # 2 and 31 days
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.make_booking(start=date.today() + timedelta(days=60))
+        self.assertEqual(len(self.client.get(url).data['booking_history']), 3)
+
+    def test_list_and_totals_are_all_time_without_a_range(self):
+        old = self.make_booking(status='completed')
+        Booking.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+        recent = self.make_booking(start=date.today() + timedelta(days=10), booking_type='monthly')
+        self.client.force_authenticate(self.daycare_user)
+        url = reverse('daycare-booking-history')
+
+        response = self.client.get(url)
+        self.assertEqual({row['id'] for row in response.data['booking_history']}, {old.id, recent.id})
+        self.assertEqual(response.data['average_booking_duration'], 16.5)  # 2 and 31 days
+        self.assertEqual(len(response.data['monthly_summary']), 6)
+        self.assertEqual(response.data['range'], {'from': None, 'to': None})
+
+        response = self.client.get(url, {'from': (date.today() - timedelta(days=30)).isoformat()})
+        self.assertEqual([row['id'] for row in response.data['booking_history']], [recent.id])
+        self.assertEqual(response.data['average_booking_duration'], 31.0)
+
+    def test_date_range_is_validated(self):
+        self.client.force_authenticate(self.daycare_user)
+        url = reverse('daycare-booking-history')
+        # Without ?from= a ?to= before the default window would leave the summary empty
+        too_early = default_range()[0] - timedelta(days=1)
+        self.assertEqual(self.client.get(url, {'to': too_early.isoformat()}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'to': date.today().isoformat()}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url, {'from': '2024-13-01'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {'from': '2024-05-01', 'to': '2024-04-01'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        response = self.client.get(url, {'from': '2024-01-15', 'to': '2024-03-01'})
+        self.assertEqual([row['month'] for row in response.data['monthly_summary']],
+                         ['January 2024', 'February 2024', 'March 2024'])
+
+
+class DailyRollupTests(BookingTestMixin, APITestCase):
+
+    def stats(self):
+        return [
+            (stats.bookings, stats.pending, stats.confirmed, stats.cancelled, stats.revenue, stats.children)
+            for stats in (DaycareDailyStats.objects.get(daycare=self.daycare),
+                          ParentDailyStats.objects.get(parent=self.parent))
+        ]
+
+    def test_rollups_follow_writes_and_match_a_rebuild(self):
+        first = self.make_booking()
+        second = self.make_booking(start=date.today() + timedelta(days=10), paid_amount=300)
+        self.assertEqual(self.stats(), [(2, 2, 0, 0, 300, 1)] * 2)
+
+        transition_booking(first.id, DAYCARE_ACTIONS['accept'], 'daycare', daycare=self.daycare)
+        transition_booking(second.id, DAYCARE_ACTIONS['cancel'], 'daycare', daycare=self.daycare)
+        self.assertEqual(self.stats(), [(2, 0, 1, 1, 300, 1)] * 2)
+
+        DaycareDailyStats.objects.update(bookings=0)
+        self.assertEqual(rebuild_all(), 2)
+        self.assertEqual(self.stats(), [(2, 0, 1, 1, 300, 1)] * 2)
+
+        first.delete()
+        second.delete()
+        self.assertFalse(DaycareDailyStats.objects.exists())
+        self.assertFalse(ParentDailyStats.objects.exists())
+
+
+class ParentStatsTests(BookingTestMixin, APITestCase):
+
+    def test_stats_are_one_query_and_follow_booking_changes(self):
+        upcoming = self.make_booking()
+        self.make_booking(start=date.today() - timedelta(days=10), status='completed', paid_amount=300)
+        self.make_booking(start=date.today() + timedelta(days=20), status='cancelled')
+        self.client.force_authenticate(self.parent_user)
+        url = reverse('booking-stats')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response.data[field] for field in ('total_bookings', 'active_bookings', 'completed_bookings',
+                                                'cancelled_bookings', 'upcoming_bookings')],
+            [3, 0, 1, 1, 1]
+        )
+        self.assertEqual(float(response.data['total_spent']), 300)
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_booking(upcoming.id, DAYCARE_ACTIONS['accept'], 'daycare', daycare=self.daycare)
+        self.assertEqual(self.client.get(url).data['active_bookings'], 1)
@@ -0,0 +1,177 @@
+"""
+Booking status transitions.
+
+Every status change goes through here as a compare-and-swap: one
+``UPDATE ... WHERE id = ? AND status IN (...)`` that writes only the
+columns the transition touches. Two concurrent requests can't both win,
+so there is no read-check-save window and nothing else on the row is
+overwritten. Whoever wins the UPDATE also hands the booking's ledger
+places back (for transitions out of HOLDING_STATUSES) and refreshes the
+daily rollups in the same transaction, and a ``BookingTransitioned`` event goes out on the
+``booking_transitioned`` signal once it commits.
+
+``apply_to`` moves a whole queryset with the same conditional UPDATE;
+``bulk_transition`` (daycare bulk actions) and the scheduled lifecycle job
+are built on it.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Booking
+from .occupancy import HOLDING_STATUSES, release_many, release_places
+from .queries import with_booking_relations
+from .rollups import refresh as refresh_rollups, refresh_bookings
+
+# Sent after commit with event=BookingTransitioned
+booking_transitioned = Signal()
+
+
+@dataclass(frozen=True)
+class BookingTransitioned:
+    booking_id: int
+    daycare_id: int
+    parent_id: int
+    action: str
+    status: str
+    by: str
+    at: datetime
+
+
+class TransitionError(Exception):
+    pass
+
+
+class BookingNotFound(TransitionError):
+    pass
+
+
+class InvalidTransition(TransitionError):
+    """The booking exists but its status (or dates) don't allow the transition."""
+
+    def __init__(self, booking):
+        super().__init__(f'Booking #{booking.pk} is {booking.status}')
+        self.booking = booking
+
+
+class Transition:
+
+    def __init__(self, action, target, sources, due=None):
+        self.action = action
+        self.target = target
+        self.sources = tuple(sources)
+        # Optional date condition: due(today) -> Q the booking must also match
+        self.due = due
+        # Completed bookings' places are all in the past and need no release
+        self.releases_places = target not in HOLDING_STATUSES and target != 'completed'
+
+    def condition(self, now):
+        condition = Q(status__in=self.sources)
+        if self.due is not None:
+            condition &= self.due(now.date())
+        return condition
+
+    def values(self, now, by, reason=''):
+        """Columns the UPDATE writes; update() bypasses auto_now, so updated_at is set here."""
+        values = {'status': self.target, 'updated_at': now}
+        if self.target == 'confirmed':
+            values['confirmed_at'] = now
+        elif self.target in ('cancelled', 'rejected'):
+            values.update(cancelled_at=now, cancelled_by=by, cancellation_reason=reason)
+        return values
+
+
+def has_ended(today):
+    """The booked period [start_date, end_date) is over."""
+    return Q(end_date__isnull=True) | Q(end_date__lte=today)
+
+
+DAYCARE_ACTIONS = {transition.action: transition for transition in [
+    Transition('accept', 'confirmed', ['pending']),
+    Transition('decline', 'rejected', ['pending']),
+    Transition('cancel', 'cancelled', ['pending', 'confirmed']),
+    Transition('complete', 'completed', ['confirmed', 'active'], due=has_ended),
+]}
+PARENT_ACTIONS = {transition.action: transition for transition in [
+    Transition('cancel', 'cancelled', ['pending', 'confirmed']),
+]}
+# Run by the advance_booking_lifecycle command, in this order
+SCHEDULED_ACTIONS = {transition.action: transition for transition in [
+    # Requests the daycare never answered before the start date
+    Transition('expire', 'expired', ['pending'], due=lambda today: Q(start_date__lt=today)),
+    Transition('activate', 'active', ['confirmed'], due=lambda today: Q(start_date__lte=today) & ~has_ended(today)),
+    Transition('complete', 'completed', ['confirmed', 'active'], due=has_ended),
+]}
+
+
+def _announce(transition, rows, by, now):
+    """Send one event per (booking id, daycare id, parent id) row after commit."""
+    events = [
+        BookingTransitioned(booking_id, daycare_id, parent_id, transition.action, transition.target, by, now)
+        for booking_id, daycare_id, parent_id in rows
+    ]
+
+    def send():
+        for event in events:
+            booking_transitioned.send(sender=Booking, event=event)
+
+    transaction.on_commit(send)
+
+
+def transition_booking(booking_id, transition, by, reason='', **owner):
+    """
+    Move one booking through ``transition`` and return it re-read.
+    ``owner`` scopes the lookup (daycare=... or parent=...). Raises
+    BookingNotFound or InvalidTransition when the UPDATE matches nothing.
+    """
+    now = timezone.now()
+    bookings = Booking.objects.filter(pk=booking_id, **owner)
+    with transaction.atomic():
+        if not bookings.filter(transition.condition(now)).update(**transition.values(now, by, reason)):
+            current = bookings.first()
+            if current is None:
+                raise BookingNotFound(booking_id)
+            raise InvalidTransition(current)
+        booking = with_booking_relations(bookings).get()
+        if transition.releases_places:
+            release_places(booking)
+        refresh_bookings([booking])
+        _announce(transition, [(booking.pk, booking.daycare_id, booking.parent_id)], by, now)
+    return booking
+
+
+def apply_to(transition, bookings, by, now, reason=''):
+    """
+    Move every booking in the ``bookings`` queryset that ``transition``
+    allows, as one conditional UPDATE. Returns the ids that moved.
+    """
+    eligible = bookings.filter(transition.condition(now))
+    with transaction.atomic():
+        rows = list(eligible.select_for_update().values_list(
+            'id', 'daycare_id', 'parent_id', 'start_date', 'end_date', 'created_at', 'closed_dates'
+        ))
+        transitioned = [row[0] for row in rows]
+        if transitioned:
+            eligible.filter(pk__in=transitioned).update(**transition.values(now, by, reason))
+            if transition.releases_places:
+                release_many([(daycare_id, start, end, closed) for _, daycare_id, _, start, end, _, closed in rows])
+            refresh_rollups([(daycare_id, parent_id, created_at.date()) for _, daycare_id, parent_id, _, _, created_at, _ in rows])
+            _announce(transition, [row[:3] for row in rows], by, now)
+    return transitioned
+
+
+def bulk_transition(daycare, booking_ids, action, reason=''):
+    """
+    Apply DAYCARE_ACTIONS[action] to those of ``booking_ids`` the daycare
+    owns and whose status allows it. Returns (transitioned ids, skipped ids).
+    """
+    transitioned = apply_to(
+        DAYCARE_ACTIONS[action], Booking.objects.filter(daycare=daycare, pk__in=booking_ids),
+        'daycare', timezone.now(), reason
+    )
+    done = set(transitioned)
+    return transitioned, [booking_id for booking_id in booking_ids if booking_id not in done]
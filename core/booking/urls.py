@@ -7,10 +7,14 @@ urlpatterns = [
     path('daycares/<int:pk>/', views.DaycareDetailView.as_view(), name='daycare-detail'),
     path('daycares/popular/', views.popular_daycares, name='popular-daycares'),
     path('daycares/nearby/', views.nearby_daycares, name='nearby-daycares'),
+    path('daycares/services/', views.ServiceTagFacetView.as_view(), name='daycare-service-facets'),
+    path('daycares/batch/', views.daycare_batch, name='daycare-batch'),
+    path('daycares/autocomplete/', views.daycare_autocomplete, name='daycare-autocomplete'),
 
     # Booking Management
     path('bookings/', views.BookingListView.as_view(), name='booking-list'),
     path('bookings/create/', views.BookingCreateView.as_view(), name='booking-create'),
+    path('bookings/bulk-create/', views.bulk_create_bookings, name='booking-bulk-create'),
     path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('bookings/<int:pk>/update/', views.BookingUpdateView.as_view(), name='booking-update'),
     path('bookings/<int:booking_id>/cancel/', views.cancel_booking, name='booking-cancel'),
@@ -29,7 +33,9 @@ urlpatterns = [
     # Daycare Booking Management
     path('daycare/bookings/', views.DaycareBookingListView.as_view(), name='daycare-booking-list'),
     # path('daycare/bookings/<int:booking_id>/', views.daycare_booking_detail, name='daycare-booking-detail'),
+    path('daycare/bookings/bulk/', views.bulk_booking_transition, name='daycare-booking-bulk'),
     path('daycare/bookings/<int:booking_id>/accept/', views.accept_booking, name='daycare-booking-accept'),
+    path('daycare/bookings/<int:booking_id>/decline/', views.reject_booking, name='daycare-booking-decline'),
     path('daycare/bookings/<int:booking_id>/complete/', views.complete_booking, name='daycare-booking-complete'),
     path('daycare/history/summary/', views.daycare_booking_history, name='daycare-booking-history'),
     path('daycare/cancel/<int:booking_id>/', views.daycare_cancel_booking, name='daycare-cancel-booking'),
@@ -3,23 +3,39 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Avg, Count, Sum
-from django.utils import timezone
-from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q, Value, FloatField
+from datetime import datetime
 from .models import (
-    Booking, BookingReview, BookingMessage, 
-    DaycareAvailability, BookingPayment, DaycarePricing
+    Booking, BookingMessage, 
+    BookingPayment, DaycarePricing
 )
 from .serializers import (
-    DaycareSearchSerializer, DaycareDetailSerializer,
-    BookingCreateSerializer, BookingSerializer, BookingUpdateSerializer,
+    DaycareSearchSerializer, DaycareDetailSerializer, DaycareComparisonSerializer,
+    BookingCreateSerializer, BookingSerializer, DaycareBookingSerializer, BookingUpdateSerializer,
     BookingCancelSerializer, BookingReviewSerializer,
     BookingMessageSerializer, BookingStatsSerializer, DaycarePricingSerializer
 )
+from .queries import (
+    verified_daycares, with_available_slots, with_all_services, with_detail_relations,
+    with_booking_relations, with_parent_profiles,
+    service_tag_facets, with_distance, with_price, within_radius, nearest
+)
+from . import autocomplete, bulk_bookings
+from .analytics import daycare_history, default_range, parent_history, parent_stats
+from .availability_matrix import OutsideHorizon, available_daycare_ids
+from .facets import search_facets
+from .search import DaycareFullTextFilter
+from .transitions import (
+    DAYCARE_ACTIONS, PARENT_ACTIONS, BookingNotFound, InvalidTransition, TransitionError,
+    bulk_transition, transition_booking
+)
+from .leaderboard import popular_snapshot
+from .listing_cache import cached_detail, cached_listing
+from users.geo import parse_coordinates
 from users.permissions import IsParent, IsDaycare
-from users.serializers import ParentProfileSerializer
 from rest_framework import serializers
-from users.models import DaycareCenter, Parent
+from users.models import Parent
 class DaycarePricingListView(generics.ListAPIView):
     """
     List pricing tiers for the authenticated daycare
@@ -52,21 +68,24 @@ def update_daycare_pricing(request):
     if not pricing_data:
         return Response({'error': 'No pricing data provided'}, status=status.HTTP_400_BAD_REQUEST)
 
+    frequencies = {choice for choice, _ in DaycarePricing.FREQUENCY_CHOICES}
     updated_pricing = []
     
     for pricing_item in pricing_data:
-        booking_type = pricing_item.get('booking_type')
+        name = pricing_item.get('name')
         price = pricing_item.get('price')
+        frequency = pricing_item.get('frequency', 'Monthly')
         
-        if not booking_type or not price:
+        if not name or not price or frequency not in frequencies:
             continue
             
+        # Saving a tier refreshes the daycare's DaycarePriceSummary (booking.signals)
         pricing_tier, created = DaycarePricing.objects.update_or_create(
             daycare=daycare,
-            booking_type=booking_type,
+            name=name,
+            frequency=frequency,
             defaults={
                 'price': price,
-                'description': pricing_item.get('description', ''),
                 'is_active': pricing_item.get('is_active', True)
             }
         )
@@ -88,34 +107,81 @@ def daycare_cancel_booking(request, booking_id):
     Daycare cancels a booking (pending or confirmed)
     """
     try:
-        daycare = request.user.daycare_profile
-        booking = Booking.objects.get(id=booking_id, daycare=daycare)
-    except Booking.DoesNotExist:
+        booking = transition_booking(
+            booking_id, DAYCARE_ACTIONS['cancel'], 'daycare',
+            reason=request.data.get('cancellation_reason', ''), daycare=request.user.daycare_profile
+        )
+    except BookingNotFound:
         return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
-
-    if booking.status not in ['pending', 'confirmed']:
+    except InvalidTransition:
         return Response({'error': 'Only pending or confirmed bookings can be cancelled.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    reason = request.data.get('cancellation_reason', '')
-    booking.status = 'cancelled'
-    booking.cancelled_at = timezone.now()
-    booking.cancelled_by = 'daycare'
-    booking.cancellation_reason = reason
-    booking.save()
-
     return Response({
         'message': 'Booking cancelled by daycare.',
         'booking': BookingSerializer(booking, context={'request': request}).data
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsDaycare])
+def reject_booking(request, booking_id):
+    """
+    Daycare declines a pending booking
+    """
+    try:
+        booking = transition_booking(
+            booking_id, DAYCARE_ACTIONS['decline'], 'daycare',
+            reason=request.data.get('reason', ''), daycare=request.user.daycare_profile
+        )
+    except BookingNotFound:
+        return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+    except InvalidTransition:
+        return Response({'error': 'Only pending bookings can be declined.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'message': 'Booking declined.',
+        'booking': BookingSerializer(booking, context={'request': request}).data
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsDaycare])
+def bulk_booking_transition(request):
+    """
+    Apply one action (accept, decline, cancel or complete) to several
+    bookings: ``{"action": "accept", "ids": [1, 2, 3]}``. Bookings that
+    aren't this daycare's or whose status doesn't allow the action are
+    reported as skipped.
+    """
+    action = request.data.get('action')
+    if action not in DAYCARE_ACTIONS:
+        return Response(
+            {'error': f'action must be one of: {", ".join(DAYCARE_ACTIONS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(value, int) for value in ids):
+        return Response({'error': 'ids must be a non-empty list of booking ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.BOOKING_BULK_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {settings.BOOKING_BULK_MAX_ITEMS} bookings per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    transitioned, skipped = bulk_transition(
+        request.user.daycare_profile, list(dict.fromkeys(ids)), action,
+        reason=request.data.get('reason', '')
+    )
+    return Response({'action': action, 'transitioned': transitioned, 'skipped': skipped})
+
+
 # --- DAYCARE VIEWS ---
 
 class DaycareBookingListView(generics.ListAPIView):
     """
-    List all bookings for the authenticated daycare
+    List all bookings for the authenticated daycare, each with its parent's profile
     """
-    serializer_class = BookingSerializer
+    serializer_class = DaycareBookingSerializer
     permission_classes = [IsAuthenticated, IsDaycare]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'booking_type', 'parent']
@@ -124,16 +190,7 @@ class DaycareBookingListView(generics.ListAPIView):
 
     def get_queryset(self):
         daycare = self.request.user.daycare_profile
-        return Booking.objects.filter(daycare=daycare).select_related(
-            'parent', 'child', 'daycare', 'parent__user'
-        )
-
-    def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        # Attach parent profile for each booking
-        for booking, data in zip(self.get_queryset(), response.data):
-            data['parent_profile'] = ParentProfileSerializer(booking.parent, context={'request': request}).data
-        return response
+        return with_parent_profiles(with_booking_relations(Booking.objects.filter(daycare=daycare)))
 
 
 @api_view(['POST'])
@@ -143,18 +200,14 @@ def accept_booking(request, booking_id):
     Daycare accepts a pending booking
     """
     try:
-        daycare = request.user.daycare_profile
-        booking = Booking.objects.get(id=booking_id, daycare=daycare)
-    except Booking.DoesNotExist:
+        booking = transition_booking(
+            booking_id, DAYCARE_ACTIONS['accept'], 'daycare', daycare=request.user.daycare_profile
+        )
+    except BookingNotFound:
         return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
-
-    if booking.status != 'pending':
+    except InvalidTransition:
         return Response({'error': 'Only pending bookings can be accepted.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    booking.status = 'confirmed'
-    booking.confirmed_at = timezone.now()
-    booking.save()
-
     return Response({
         'message': 'Booking accepted and confirmed.',
         'booking': BookingSerializer(booking, context={'request': request}).data
@@ -167,21 +220,16 @@ def complete_booking(request, booking_id):
     """
     Daycare marks a booking as completed
     """
+    transition = DAYCARE_ACTIONS['complete']
     try:
-        daycare = request.user.daycare_profile
-        booking = Booking.objects.get(id=booking_id, daycare=daycare)
-    except Booking.DoesNotExist:
+        booking = transition_booking(booking_id, transition, 'daycare', daycare=request.user.daycare_profile)
+    except BookingNotFound:
         return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
-
-    if booking.status not in ['confirmed', 'active']:
-        return Response({'error': 'Only active or confirmed bookings can be marked as completed.'}, status=status.HTTP_400_BAD_REQUEST)
-
-    if booking.end_date and booking.end_date > timezone.now().date():
+    except InvalidTransition as exc:
+        if exc.booking.status not in transition.sources:
+            return Response({'error': 'Only active or confirmed bookings can be marked as completed.'}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'error': 'Booking cannot be marked as completed before the end date.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    booking.status = 'completed'
-    booking.save()
-
     return Response({
         'message': 'Booking marked as completed.',
         'booking': BookingSerializer(booking, context={'request': request}).data
@@ -192,125 +240,157 @@ def complete_booking(request, booking_id):
 @permission_classes([IsAuthenticated, IsDaycare])
 def daycare_booking_history(request):
     """
-    Get booking history for daycare (with reviews)
+    Get booking history for daycare (with reviews), optionally limited to
+    bookings created between ?from= and ?to= (YYYY-MM-DD)
     """
     daycare = request.user.daycare_profile
-    bookings = Booking.objects.filter(daycare=daycare).select_related('parent', 'child')
-
-    # Build booking history list
-    booking_history = []
-    for booking in bookings:
-        review = BookingReview.objects.filter(booking=booking).first()
-        booking_history.append({
-            'id': booking.id,
-            'parent_name': booking.parent.full_name if booking.parent else '',
-            'child_name': booking.child.full_name if booking.child else '',
-            'date': booking.start_date.strftime('%Y-%m-%d') if booking.start_date else '',
-            'rating': review.rating if review else 0,
-            'review': review.text if review else '',
-        })
-
-    six_months_ago = timezone.now().date() - timedelta(days=180)
-    monthly_bookings = []
-    for i in range(6):
-        month_start = six_months_ago + timedelta(days=30*i)
-        month_end = month_start + timedelta(days=30)
-        month_bookings = bookings.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lt=month_end
+    params = request.query_params
+    try:
+        start, end = (
+            datetime.strptime(params[name], '%Y-%m-%d').date() if params.get(name) else None
+            for name in ('from', 'to')
+        )
+    except ValueError:
+        raise serializers.ValidationError({'from': 'Dates must be in YYYY-MM-DD format.'})
+    if start and end and end < start:
+        raise serializers.ValidationError({'to': 'End date must not be before the start date.'})
+    # Without ?from= the monthly summary starts at the default window's start
+    default_start = default_range()[0]
+    if end and not start and end < default_start:
+        raise serializers.ValidationError(
+            {'to': f'End date must not be before {default_start.isoformat()} unless ?from= is given.'}
         )
-        monthly_bookings.append({
-            'month': month_start.strftime('%B %Y'),
-            'bookings': month_bookings.count(),
-            'amount_earned': month_bookings.aggregate(
-                total=Sum('paid_amount')
-            )['total'] or 0
-        })
-
-    frequent_parents = bookings.values(
-        'parent__full_name', 'parent__id'
-    ).annotate(
-        booking_count=Count('id')
-    ).order_by('-booking_count')[:5]
 
-    return Response({
-        'booking_history': booking_history,
-        'monthly_summary': monthly_bookings,
-        'frequent_parents': frequent_parents,
-        'total_children_served': bookings.values('child').distinct().count(),
-        'average_booking_duration': bookings.filter(
-            end_date__isnull=False
-        ).aggregate(
-            avg_duration=Avg('duration_days')
-        )['avg_duration'] or 0
-    })
+    return Response(daycare_history(daycare.id, start, end))
 from .serializers import (
     DaycareSearchSerializer, DaycareDetailSerializer,
     BookingCreateSerializer, BookingSerializer, BookingUpdateSerializer,
     BookingCancelSerializer, BookingReviewSerializer,
-    BookingMessageSerializer, BookingStatsSerializer
+    BookingMessageSerializer, BookingStatsSerializer, ServiceTagSerializer
 )
 from rest_framework import serializers
 
 
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
+NEARBY_DEFAULT_RADIUS_KM = 5.0
+NEARBY_MAX_RADIUS_KM = 50.0
+PRICE_FILTER_MAX = 99999999.0
+AUTOCOMPLETE_DEFAULT_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+
+def _bounded_number(value, cast, default, maximum):
+    """Parse a positive query parameter, falling back to default and capping at maximum."""
+    try:
+        value = cast(value)
+    except (TypeError, ValueError):
+        return default
+    if not value > 0:  # also rejects nan
+        return default
+    return min(value, maximum)
+
+
 class DaycareSearchView(generics.ListAPIView):
     """
     Search and filter verified daycares
     """
     serializer_class = DaycareSearchSerializer
     permission_classes = [IsAuthenticated, IsParent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, DaycareFullTextFilter, filters.OrderingFilter]
     filterset_fields = ['area']
     search_fields = ['name', 'address', 'services', 'description']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'relevance', 'distance', 'price']
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = DaycareCenter.objects.filter(
-            user__is_verified=True,
-            user__is_email_verified=True
-        ).select_related('user')
+        queryset = with_available_slots(verified_daycares())
+        
+        # Distance from ?lat=&lng=, optionally limited to ?radius_km=
+        params = self.request.query_params
+        origin = parse_coordinates(params.get('lat'), params.get('lng'))
+        if origin and 'radius_km' in params:
+            radius_km = _bounded_number(params.get('radius_km'), float, NEARBY_DEFAULT_RADIUS_KM, NEARBY_MAX_RADIUS_KM)
+            queryset = within_radius(queryset, *origin, radius_km)
+        elif origin:
+            queryset = with_distance(queryset, *origin)
+        else:
+            queryset = queryset.annotate(distance=Value(None, output_field=FloatField()))
+        
+        # Price range for ?price_frequency= (Monthly by default), from the price summaries
+        frequency = params.get('price_frequency', 'Monthly').capitalize()
+        if frequency not in dict(DaycarePricing.FREQUENCY_CHOICES):
+            frequency = 'Monthly'
+        queryset = with_price(queryset, frequency)
+        min_price = _bounded_number(params.get('min_price'), float, None, PRICE_FILTER_MAX)
+        if min_price is not None:
+            # Has a tier at or above the floor
+            queryset = queryset.filter(price_max__gte=min_price)
+        max_price = _bounded_number(params.get('max_price'), float, None, PRICE_FILTER_MAX)
+        if max_price is not None:
+            # Has a tier within budget
+            queryset = queryset.filter(price__lte=max_price)
         
         # Filter by rating
         min_rating = self.request.query_params.get('min_rating')
         if min_rating:
             try:
                 min_rating = float(min_rating)
-                # Get daycares with average rating >= min_rating
-                daycare_ids = []
-                for daycare in queryset:
-                    avg_rating = daycare.reviews.filter(is_approved=True).aggregate(
-                        avg_rating=Avg('rating')
-                    )['avg_rating']
-                    if avg_rating and avg_rating >= min_rating:
-                        daycare_ids.append(daycare.id)
-                queryset = queryset.filter(id__in=daycare_ids)
+                queryset = queryset.filter(review_count__gt=0, rating__gte=min_rating)
             except ValueError:
                 pass
         
         # Filter by availability
         has_availability = self.request.query_params.get('has_availability')
         if has_availability == 'true':
-            today = timezone.now().strftime('%A').lower()
-            available_daycare_ids = []
-            for daycare in queryset:
-                try:
-                    availability = daycare.availability.get(day_of_week=today)
-                    if availability.available_slots > 0:
-                        available_daycare_ids.append(daycare.id)
-                except DaycareAvailability.DoesNotExist:
-                    pass
-            queryset = queryset.filter(id__in=available_daycare_ids)
+            queryset = queryset.filter(today_available_slots__gt=0)
         
         # Filter by services
         services = self.request.query_params.get('services')
         if services:
-            service_list = [s.strip() for s in services.split(',')]
-            for service in service_list:
-                queryset = queryset.filter(services__icontains=service)
+            queryset = with_all_services(queryset, services.split(','))
+        
+        # Free place on every weekday (or every day) of ?available_from=&available_to=
+        if params.get('available_from') or params.get('available_to'):
+            queryset = queryset.filter(id__in=self.available_ids(params))
         
         return queryset
 
+    def available_ids(self, params):
+        """Answered from the in-memory capacity matrix rather than per-daycare SQL."""
+        try:
+            start = datetime.strptime(params.get('available_from') or params.get('available_to'), '%Y-%m-%d').date()
+            end = datetime.strptime(params.get('available_to') or params.get('available_from'), '%Y-%m-%d').date()
+        except ValueError:
+            raise serializers.ValidationError({'available_from': 'Dates must be in YYYY-MM-DD format.'})
+        if end < start:
+            raise serializers.ValidationError({'available_to': 'End date must not be before the start date.'})
+        try:
+            return available_daycare_ids(
+                start, end, weekdays_only=params.get('include_weekends') != 'true'
+            )
+        except OutsideHorizon as exc:
+            raise serializers.ValidationError({'available_to': str(exc)})
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Facets describe the whole result set, so only the first page carries them
+        if 'cursor' not in request.query_params:
+            response.data['facets'] = search_facets(self.filter_queryset(self.get_queryset()), request.query_params)
+        return response
+
+
+class ServiceTagFacetView(generics.ListAPIView):
+    """
+    Service tags offered by verified daycares, with how many daycares offer each
+    """
+    serializer_class = ServiceTagSerializer
+    permission_classes = [IsAuthenticated, IsParent]
+    pagination_class = None
+
+    def get_queryset(self):
+        return service_tag_facets()
+
 
 class DaycareDetailView(generics.RetrieveAPIView):
     """
@@ -320,10 +400,13 @@ class DaycareDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsParent]
     
     def get_queryset(self):
-        return DaycareCenter.objects.filter(
-            user__is_verified=True,
-            user__is_email_verified=True
-        ).select_related('user')
+        return with_detail_relations(verified_daycares())
+
+    def retrieve(self, request, *args, **kwargs):
+        data = cached_detail(
+            request, self.kwargs['pk'], lambda: self.get_serializer(self.get_object()).data
+        )
+        return Response(data)
 
 
 class BookingCreateView(generics.CreateAPIView):
@@ -345,6 +428,40 @@ class BookingCreateView(generics.CreateAPIView):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsParent])
+def bulk_create_bookings(request):
+    """
+    Create several bookings at once: ``{"bookings": [...], "mode": "atomic"}``.
+    In atomic mode (the default) either every booking is created or none is;
+    with ``"mode": "best_effort"`` the valid ones are created regardless.
+    """
+    items = request.data.get('bookings')
+    mode = request.data.get('mode', bulk_bookings.ATOMIC)
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'bookings must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BOOKING_BULK_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {settings.BOOKING_BULK_MAX_ITEMS} bookings per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if mode not in bulk_bookings.MODES:
+        return Response(
+            {'error': f'mode must be one of: {", ".join(bulk_bookings.MODES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = bulk_bookings.create_bookings(request.user.parent_profile, items, mode)
+    created = sum(result['status'] == 'created' for result in results)
+    if created == len(results):
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({'created': created, 'results': results}, status=response_status)
+
+
 class BookingListView(generics.ListAPIView):
     """
     List all bookings for the authenticated parent
@@ -358,9 +475,7 @@ class BookingListView(generics.ListAPIView):
     
     def get_queryset(self):
         parent = self.request.user.parent_profile
-        return Booking.objects.filter(parent=parent).select_related(
-            'daycare', 'child', 'daycare__user'
-        )
+        return with_booking_relations(Booking.objects.filter(parent=parent))
 
 
 class BookingDetailView(generics.RetrieveAPIView):
@@ -372,9 +487,7 @@ class BookingDetailView(generics.RetrieveAPIView):
     
     def get_queryset(self):
         parent = self.request.user.parent_profile
-        return Booking.objects.filter(parent=parent).select_related(
-            'daycare', 'child', 'daycare__user'
-        )
+        return with_booking_relations(Booking.objects.filter(parent=parent))
 
 
 class BookingUpdateView(generics.UpdateAPIView):
@@ -413,11 +526,17 @@ def cancel_booking(request, booking_id):
     )
     
     if serializer.is_valid():
-        booking.status = 'cancelled'
-        booking.cancelled_at = timezone.now()
-        booking.cancelled_by = 'parent'
-        booking.cancellation_reason = serializer.validated_data['cancellation_reason']
-        booking.save()
+        try:
+            booking = transition_booking(
+                booking.pk, PARENT_ACTIONS['cancel'], 'parent',
+                reason=serializer.validated_data['cancellation_reason'], parent=parent
+            )
+        except TransitionError:
+            # Cancelled or otherwise moved on since the check above
+            return Response(
+                {'error': 'This booking can no longer be cancelled.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
             'message': 'Booking cancelled successfully',
@@ -505,23 +624,7 @@ def booking_stats(request):
     """
     Get booking statistics for the authenticated parent
     """
-    parent = request.user.parent_profile
-    bookings = Booking.objects.filter(parent=parent)
-    
-    stats = {
-        'total_bookings': bookings.count(),
-        'active_bookings': bookings.filter(status__in=['confirmed', 'active']).count(),
-        'completed_bookings': bookings.filter(status='completed').count(),
-        'cancelled_bookings': bookings.filter(status='cancelled').count(),
-        'total_spent': bookings.filter(
-            status__in=['completed', 'active']
-        ).aggregate(total=Sum('paid_amount'))['total'] or 0,
-        'upcoming_bookings': bookings.filter(
-            status__in=['pending', 'confirmed'],
-            start_date__gte=timezone.now().date()
-        ).count()
-    }
-    
+    stats = parent_stats(request.user.parent_profile.id)
     serializer = BookingStatsSerializer(stats)
     return Response(serializer.data)
 
@@ -532,16 +635,9 @@ def popular_daycares(request):
     """
     Get popular daycares based on bookings and reviews
     """
-    daycares = DaycareCenter.objects.filter(
-        user__is_verified=True,
-        user__is_email_verified=True
-    ).annotate(
-        booking_count=Count('bookings'),
-        review_count=Count('reviews', filter=Q(reviews__is_approved=True)),
-        avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True))
-    ).filter(
-        booking_count__gt=0
-    ).order_by('-booking_count', '-avg_rating')[:10]
+    snapshot = popular_snapshot()
+    by_id = with_available_slots(verified_daycares()).in_bulk([daycare_id for daycare_id, _ in snapshot])
+    daycares = [by_id[daycare_id] for daycare_id, _ in snapshot if daycare_id in by_id]
     
     serializer = DaycareSearchSerializer(
         daycares, 
@@ -551,18 +647,91 @@ def popular_daycares(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def daycare_autocomplete(request):
+    """
+    Search-box suggestions for ?q=: verified daycare names, areas and
+    service tags, answered from the in-memory autocomplete index.
+    """
+    query = request.query_params.get('q', '')
+    limit = _bounded_number(
+        request.query_params.get('limit'), int, AUTOCOMPLETE_DEFAULT_LIMIT, AUTOCOMPLETE_MAX_LIMIT
+    )
+    return Response({'query': query, 'suggestions': autocomplete.suggest(query, limit)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsParent])
+def daycare_batch(request):
+    """
+    Fetch several daycares at once for comparison: ?ids=1,2,3 (or repeated
+    ids=). Returns detail, pricing, rating aggregates and today's open
+    slots in the requested order, in a fixed number of queries. Ids that
+    don't match a verified daycare are listed under ``missing``.
+    """
+    max_ids = settings.DAYCARE_BATCH_MAX_IDS
+    raw_ids = [part for value in request.query_params.getlist('ids') for part in value.split(',')]
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw_ids if part.strip()))
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of integers'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not ids:
+        return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > max_ids:
+        return Response({'error': f'At most {max_ids} daycares can be compared at once'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    by_id = with_detail_relations(with_available_slots(verified_daycares())).in_bulk(ids)
+    serializer = DaycareComparisonSerializer(
+        [by_id[daycare_id] for daycare_id in ids if daycare_id in by_id],
+        many=True,
+        context={'request': request}
+    )
+    return Response({
+        'results': serializer.data,
+        'missing': [daycare_id for daycare_id in ids if daycare_id not in by_id],
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsParent])
 def nearby_daycares(request):
     """
-    Get daycares in the same area as the parent
+    Get daycares near the parent.
+
+    Uses ?lat=&lng= or the parent's saved address coordinates: returns the
+    ``limit`` nearest daycares, or every daycare within ``radius_km`` when
+    that parameter is given, sorted by distance. Without coordinates it
+    falls back to daycares in the parent's area.
     """
     parent = request.user.parent_profile
-    
+    address = getattr(parent, 'address', None)
+    params = request.query_params
+
+    origin = parse_coordinates(params.get('lat'), params.get('lng'))
+    if origin is None and address is not None:
+        origin = parse_coordinates(address.latitude, address.longitude)
+
+    if origin:
+        latitude, longitude = origin
+        limit = _bounded_number(params.get('limit'), int, NEARBY_DEFAULT_LIMIT, NEARBY_MAX_LIMIT)
+        daycares = with_available_slots(verified_daycares())
+        if 'radius_km' in params:
+            radius_km = _bounded_number(params.get('radius_km'), float, NEARBY_DEFAULT_RADIUS_KM, NEARBY_MAX_RADIUS_KM)
+            daycares = within_radius(daycares, latitude, longitude, radius_km).order_by('distance')[:limit]
+        else:
+            daycares = nearest(daycares, latitude, longitude, limit, NEARBY_MAX_RADIUS_KM)
+        serializer = DaycareSearchSerializer(daycares, many=True, context={'request': request})
+        return Response({
+            'area': address.get_area_display() if address is not None else '',
+            'origin': {'latitude': latitude, 'longitude': longitude},
+            'daycares': serializer.data
+        })
+
     # Get parent's area
-    parent_area = None
-    if hasattr(parent, 'address') and parent.address.area:
-        parent_area = parent.address.area
+    parent_area = address.area if address is not None else None
     
     if not parent_area:
         return Response({
@@ -570,13 +739,9 @@ def nearby_daycares(request):
             'daycares': []
         })
     
-    daycares = DaycareCenter.objects.filter(
-        user__is_verified=True,
-        user__is_email_verified=True,
+    daycares = with_available_slots(verified_daycares()).filter(
         area=parent_area
-    ).annotate(
-        avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True))
-    ).order_by('-avg_rating')
+    ).order_by('-rating')
     
     serializer = DaycareSearchSerializer(
         daycares, 
@@ -584,7 +749,7 @@ def nearby_daycares(request):
         context={'request': request}
     )
     return Response({
-        'area': parent.address.get_area_display(),
+        'area': address.get_area_display(),
         'daycares': serializer.data
     })
 
@@ -595,47 +760,7 @@ def booking_history_summary(request):
     """
     Get a summary of booking history with key metrics
     """
-    parent = request.user.parent_profile
-    bookings = Booking.objects.filter(parent=parent)
-    
-    # Monthly booking summary for the last 6 months
-    six_months_ago = timezone.now().date() - timedelta(days=180)
-    monthly_bookings = []
-    
-    for i in range(6):
-        month_start = six_months_ago + timedelta(days=30*i)
-        month_end = month_start + timedelta(days=30)
-        
-        month_bookings = bookings.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lt=month_end
-        )
-        
-        monthly_bookings.append({
-            'month': month_start.strftime('%B %Y'),
-            'bookings': month_bookings.count(),
-            'amount_spent': month_bookings.aggregate(
-                total=Sum('paid_amount')
-            )['total'] or 0
-        })
-    
-    # Favorite daycares (most booked)
-    favorite_daycares = bookings.values(
-        'daycare__name', 'daycare__id'
-    ).annotate(
-        booking_count=Count('id')
-    ).order_by('-booking_count')[:5]
-    
-    return Response({
-        'monthly_summary': monthly_bookings,
-        'favorite_daycares': favorite_daycares,
-        'total_children_enrolled': bookings.values('child').distinct().count(),
-        'average_booking_duration': bookings.filter(
-            end_date__isnull=False
-        ).aggregate(
-            avg_duration=Avg('duration_days')
-        )['avg_duration'] or 0
-    })
+    return Response(parent_history(request.user.parent_profile.id))
 from rest_framework.permissions import AllowAny
 from rest_framework import generics
 
@@ -647,7 +772,8 @@ class PublicDaycareListView(generics.ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return DaycareCenter.objects.filter(
-            user__is_verified=True,
-            user__is_email_verified=True
-        ).select_related('user')
\ No newline at end of file
+        return with_available_slots(verified_daycares())
+
+    def list(self, request, *args, **kwargs):
+        # Anonymous and identical for everyone: serve rendered pages from the shared cache
+        return cached_listing(request, lambda: super(PublicDaycareListView, self).list(request, *args, **kwargs))
@@ -100,10 +100,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts, so check-then-write
+        # sequences (booking overlap and capacity checks) are serialised the
+        # way select_for_update() serialises them on other databases
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
 
+# Cache
+# Shared Redis cache when REDIS_CACHE_URL is set (needed for cross-process
+# response caching and single-flight refreshes); per-process memory otherwise.
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,9 +179,20 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
         'user': '1000/hour'
-    }
+    },
+    'DEFAULT_PAGINATION_CLASS': 'booking.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
+# Most daycares one comparison request (booking daycares/batch/) may fetch
+DAYCARE_BATCH_MAX_IDS = int(os.getenv('DAYCARE_BATCH_MAX_IDS', 20))
+
+# Most service tags the search facets list (the full list is booking daycares/services/)
+SEARCH_SERVICE_FACET_LIMIT = int(os.getenv('SEARCH_SERVICE_FACET_LIMIT', 20))
+
+# Most bookings one bulk request (booking bookings/bulk-create/, daycare/bookings/bulk/) may hold
+BOOKING_BULK_MAX_ITEMS = int(os.getenv('BOOKING_BULK_MAX_ITEMS', 50))
+
 # Simple JWT settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Parent, DaycareCenter, Address, Child, EmergencyContact
+from .models import User, Parent, DaycareCenter, Address, Child, EmergencyContact, ServiceTag
 from django.utils import timezone
 from rest_framework_simplejwt.token_blacklist import models as blacklist_models
 from django.utils.html import format_html
@@ -93,6 +93,11 @@ class DaycareCenterAdmin(admin.ModelAdmin):
         return "-"
     image_tag.short_description = 'Image'
 
+@admin.register(ServiceTag)
+class ServiceTagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+
 @admin.register(Address)
 class AddressAdmin(admin.ModelAdmin):
     list_display = ('parent', 'street_address', 'get_area_display', 'city', 'postal_code')
@@ -0,0 +1,64 @@
+"""
+Grid-bucket spatial index helpers.
+
+Coordinates are bucketed into fixed-size lat/lng cells stored as indexed
+integer columns. A radius query first narrows candidates to the cells
+overlapping the search circle's bounding box (an index range scan), then
+computes the exact haversine distance in SQL for the survivors.
+"""
+import math
+
+from django.db.models import Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+# ~5.5 km per cell in latitude; small enough that a city-sized radius touches few cells
+GRID_CELL_DEGREES = 0.05
+
+
+def grid_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None, None
+    return (
+        math.floor(latitude / GRID_CELL_DEGREES),
+        math.floor(longitude / GRID_CELL_DEGREES),
+    )
+
+
+def bounding_cells(latitude, longitude, radius_km):
+    """Inclusive (lat_cell range, lng_cell range) covering a circle of radius_km."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    lat_lo, lng_lo = grid_cell(latitude - lat_delta, longitude - lng_delta)
+    lat_hi, lng_hi = grid_cell(latitude + lat_delta, longitude + lng_delta)
+    return (lat_lo, lat_hi), (lng_lo, lng_hi)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def distance_expression(latitude, longitude, lat_field='latitude', lng_field='longitude'):
+    """Haversine distance in km from (latitude, longitude) to the row's coordinates."""
+    lat = Radians(lat_field)
+    origin_lat = Value(math.radians(latitude))
+    d_lat = (lat - origin_lat) / 2
+    d_lng = (Radians(lng_field) - Value(math.radians(longitude))) / 2
+    a = Power(Sin(d_lat), 2) + Cos(origin_lat) * Cos(lat) * Power(Sin(d_lng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+
+def parse_coordinates(latitude, longitude):
+    """Return a valid (lat, lng) float pair, or None."""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_remove_daycarecenter_pricing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='avg_cleanliness_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='avg_communication_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='avg_staff_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='avg_value_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='daycarecenter',
+            name='rating',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+    ]
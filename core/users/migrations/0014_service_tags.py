@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_daycarecenter_review_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DaycareServiceTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_featured', models.BooleanField(default=False)),
+                ('daycare', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='service_tag_links', to='users.daycarecenter')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daycare_links', to='users.servicetag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='daycarecenter',
+            name='service_tags',
+            field=models.ManyToManyField(blank=True, related_name='daycares', through='users.DaycareServiceTag', to='users.servicetag'),
+        ),
+        migrations.AddIndex(
+            model_name='daycareservicetag',
+            index=models.Index(fields=['tag', 'daycare'], name='users_dayca_tag_id_c31eba_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='daycareservicetag',
+            unique_together={('daycare', 'tag')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+import re
+
+from django.db import migrations
+from django.utils.text import slugify
+
+SERVICE_SEPARATORS = re.compile(r'[,;\n]+')
+
+
+def parse(text):
+    tags = {}
+    for part in SERVICE_SEPARATORS.split(text or ''):
+        name = ' '.join(part.split())
+        slug = slugify(name)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name[:100]
+    return tags
+
+
+def populate(apps, schema_editor):
+    DaycareCenter = apps.get_model('users', 'DaycareCenter')
+    ServiceTag = apps.get_model('users', 'ServiceTag')
+    DaycareServiceTag = apps.get_model('users', 'DaycareServiceTag')
+
+    parsed = {}
+    names = {}
+    for daycare_id, services, featured_services in DaycareCenter.objects.values_list(
+        'id', 'services', 'featured_services'
+    ):
+        services, featured = parse(services), parse(featured_services)
+        wanted = {slug: slug in featured for slug in {**services, **featured}}
+        parsed[daycare_id] = wanted
+        names.update(featured)
+        names.update(services)
+
+    ServiceTag.objects.bulk_create(
+        [ServiceTag(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    tag_ids = dict(ServiceTag.objects.values_list('slug', 'id'))
+    DaycareServiceTag.objects.bulk_create(
+        [
+            DaycareServiceTag(daycare_id=daycare_id, tag_id=tag_ids[slug], is_featured=is_featured)
+            for daycare_id, wanted in parsed.items()
+            for slug, is_featured in wanted.items()
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_service_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
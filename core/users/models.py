@@ -2,10 +2,18 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password, check_password
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.text import slugify
 import random
+import re
 import string
 from datetime import timedelta
 
+from .geo import grid_cell
+
+LATITUDE_VALIDATORS = [MinValueValidator(-90), MaxValueValidator(90)]
+LONGITUDE_VALIDATORS = [MinValueValidator(-180), MaxValueValidator(180)]
+
 # Area choices for Bangladesh
 AREA_CHOICES = [
     ('gulshan', 'Gulshan'),
@@ -145,6 +153,8 @@ class Address(models.Model):
     area = models.CharField(max_length=20, choices=AREA_CHOICES, blank=True)
     postal_code = models.CharField(max_length=20, blank=True)
     country = models.CharField(max_length=100, default='Bangladesh')
+    latitude = models.FloatField(null=True, blank=True, validators=LATITUDE_VALIDATORS)
+    longitude = models.FloatField(null=True, blank=True, validators=LONGITUDE_VALIDATORS)
     
     def __str__(self):
         return f"{self.street_address}, {self.get_area_display()}"
@@ -214,7 +224,13 @@ class DaycareCenter(models.Model):
     area = models.CharField(max_length=20, choices=AREA_CHOICES, blank=True)
     phone = models.CharField(max_length=20)
     is_verified = models.BooleanField(default=False)
-    rating = models.FloatField(default=0.0)
+    # Review aggregates, maintained from approved BookingReviews (see booking.ratings)
+    rating = models.FloatField(default=0.0, db_index=True)
+    review_count = models.PositiveIntegerField(default=0)
+    avg_cleanliness_rating = models.FloatField(null=True, blank=True)
+    avg_staff_rating = models.FloatField(null=True, blank=True)
+    avg_communication_rating = models.FloatField(null=True, blank=True)
+    avg_value_rating = models.FloatField(null=True, blank=True)
     services = models.TextField()
     featured_services = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -226,10 +242,99 @@ class DaycareCenter(models.Model):
         blank=True
     )
     description = models.TextField(blank=True, default="")
+    latitude = models.FloatField(null=True, blank=True, validators=LATITUDE_VALIDATORS)
+    longitude = models.FloatField(null=True, blank=True, validators=LONGITUDE_VALIDATORS)
+    # Spatial grid bucket derived from latitude/longitude on save (see users.geo)
+    grid_lat = models.IntegerField(null=True, blank=True, editable=False)
+    grid_lng = models.IntegerField(null=True, blank=True, editable=False)
+    # Normalised from services / featured_services on save (see sync_service_tags)
+    service_tags = models.ManyToManyField(
+        'ServiceTag', through='DaycareServiceTag', related_name='daycares', blank=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['grid_lat', 'grid_lng']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.grid_lat, self.grid_lng = grid_cell(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'grid_lat', 'grid_lng'}
+        super().save(*args, **kwargs)
+
+    def sync_service_tags(self):
+        """Mirror the free-text services/featured_services fields into ServiceTag links."""
+        wanted = parse_service_tags(self.services)
+        featured = parse_service_tags(self.featured_services)
+        for slug, name in featured.items():
+            wanted.setdefault(slug, name)
+
+        ServiceTag.objects.bulk_create(
+            [ServiceTag(slug=slug, name=name) for slug, name in wanted.items()],
+            ignore_conflicts=True,
+        )
+        tags = dict(ServiceTag.objects.filter(slug__in=wanted).values_list('slug', 'id'))
+
+        links = DaycareServiceTag.objects.filter(daycare=self)
+        links.exclude(tag_id__in=tags.values()).delete()
+        existing = {link.tag_id: link for link in links}
+        to_create, to_update = [], []
+        for slug, tag_id in tags.items():
+            is_featured = slug in featured
+            link = existing.get(tag_id)
+            if link is None:
+                to_create.append(DaycareServiceTag(daycare=self, tag_id=tag_id, is_featured=is_featured))
+            elif link.is_featured != is_featured:
+                link.is_featured = is_featured
+                to_update.append(link)
+        DaycareServiceTag.objects.bulk_create(to_create)
+        DaycareServiceTag.objects.bulk_update(to_update, ['is_featured'])
+
+
+SERVICE_SEPARATORS = re.compile(r'[,;\n]+')
+
+
+def parse_service_tags(text):
+    """Split a comma-separated services string into an ordered {slug: display name} dict."""
+    tags = {}
+    for part in SERVICE_SEPARATORS.split(text or ''):
+        name = ' '.join(part.split())
+        slug = slugify(name)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name[:100]
+    return tags
+
+
+class ServiceTag(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ['name']
 
     def __str__(self):
         return self.name
 
+
+class DaycareServiceTag(models.Model):
+    daycare = models.ForeignKey(DaycareCenter, on_delete=models.CASCADE, related_name='service_tag_links')
+    tag = models.ForeignKey(ServiceTag, on_delete=models.CASCADE, related_name='daycare_links')
+    is_featured = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ['daycare', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'daycare']),
+        ]
+
+    def __str__(self):
+        return f"{self.daycare.name} - {self.tag.name}"
+
 class DaycareImage(models.Model):
     daycare = models.ForeignKey(DaycareCenter, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='daycare_images/')
\ No newline at end of file
@@ -215,7 +215,10 @@ class AddressSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Address
-        fields = ['street_address', 'city', 'area', 'area_display', 'postal_code', 'country', 'full_address']
+        fields = [
+            'street_address', 'city', 'area', 'area_display', 'postal_code', 'country',
+            'latitude', 'longitude', 'full_address'
+        ]
     
     def get_area_display(self, obj):
         return obj.get_area_display() if obj.area else ""
@@ -274,12 +277,15 @@ class UpdateParentProfileSerializer(serializers.ModelSerializer):
     area = serializers.ChoiceField(choices=AREA_CHOICES, required=False, allow_blank=True)
     postal_code = serializers.CharField(required=False, allow_blank=True)
     country = serializers.CharField(required=False, allow_blank=True)
+    latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
     
     class Meta:
         model = Parent
         fields = [
             'full_name', 'profession', 'phone', 'profile_image',
-            'street_address', 'city', 'area', 'postal_code', 'country'
+            'street_address', 'city', 'area', 'postal_code', 'country',
+            'latitude', 'longitude'
         ]
 
     def validate_phone(self, value):
@@ -295,6 +301,8 @@ class UpdateParentProfileSerializer(serializers.ModelSerializer):
             'area': validated_data.pop('area', None),
             'postal_code': validated_data.pop('postal_code', None),
             'country': validated_data.pop('country', None),
+            'latitude': validated_data.pop('latitude', None),
+            'longitude': validated_data.pop('longitude', None),
         }
         
         # Update parent fields
@@ -430,7 +438,7 @@ class DaycareProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = DaycareCenter
         fields = [
-            'name', 'phone', 'address', 'area', 'description', 'services',
+            'name', 'phone', 'address', 'area', 'latitude', 'longitude', 'description', 'services',
             'featured_services', 'rating', 'nid_number', 'email', 'user_type',
             'is_verified', 'is_email_verified', 'joined_at', 'main_image_url',
             'images', 'pricing_tiers'
@@ -449,18 +457,50 @@ class UpdateDaycareProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = DaycareCenter
         fields = [
-            'name', 'phone', 'address', 'area', 'description',
+            'name', 'phone', 'address', 'area', 'latitude', 'longitude', 'description',
             'services', 'featured_services', 'images'
         ]
 
-    def update(self, instance, validated_data):
+    def _pricing_tiers(self):
+        """The request's pricing_tiers list (sent as JSON or a list), or None."""
         request = self.context.get('request')
+        if not (request and hasattr(request, 'data')):
+            return None
+        raw = request.data.get('pricing_tiers')
+        if not raw:
+            return None
+        if isinstance(raw, str):
+            try:
+                return json.loads(raw)
+            except Exception:
+                return []
+        return raw if isinstance(raw, list) else None
+
+    def validate(self, data):
+        # Tiers are unique per (daycare, name, frequency); catch repeats before
+        # the recreate in update() hits the constraint
+        seen = set()
+        for tier in self._pricing_tiers() or []:
+            if not (isinstance(tier, dict) and tier.get('name') and tier.get('price') and tier.get('frequency')):
+                continue
+            key = (tier['name'], tier['frequency'])
+            if key in seen:
+                raise serializers.ValidationError({
+                    'pricing_tiers': f"Duplicate {tier['frequency']} tier named '{tier['name']}'."
+                })
+            seen.add(key)
+        return data
+
+    def update(self, instance, validated_data):
         images_data = validated_data.pop('images', None)
 
-        # Update main DaycareCenter fields
+        # Update main DaycareCenter fields; save only those, so the review
+        # aggregates (rating, review_count, avg_*) kept up by the review
+        # signals aren't overwritten with the values loaded for this request
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
 
         # Handle images
         if images_data is not None:
@@ -469,18 +509,7 @@ class UpdateDaycareProfileSerializer(serializers.ModelSerializer):
                 DaycareImage.objects.create(daycare=instance, image=img)
 
         # --- Handle pricing_tiers manually ---
-        pricing_tiers_data = None
-        if request and hasattr(request, 'data'):
-            raw = request.data.get('pricing_tiers')
-            import json
-            if raw:
-                if isinstance(raw, str):
-                    try:
-                        pricing_tiers_data = json.loads(raw)
-                    except Exception:
-                        pricing_tiers_data = []
-                elif isinstance(raw, list):
-                    pricing_tiers_data = raw
+        pricing_tiers_data = self._pricing_tiers()
         print("DEBUG: pricing_tiers_data to be saved:", pricing_tiers_data)
         if pricing_tiers_data and isinstance(pricing_tiers_data, list):
             instance.pricing_tiers.all().delete()
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import DaycareCenter
+
+
+@receiver(post_save, sender=DaycareCenter)
+def daycare_saved(sender, instance, raw=False, **kwargs):
+    """Keep the normalised ServiceTag links in step with the services text."""
+    if not raw:
+        instance.sync_service_tags()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import { bookingAPI } from '../services/api';
+import { bookingAPI, fetchAllPages, MAX_PAGE_SIZE } from '../services/api';
 import {
   Container,
   Row,
@@ -57,8 +57,8 @@ const DaycareBookings = () => {
     try {
       setIsLoading(true);
       setError("");
-      const response = await bookingAPI.getDaycareBookings();
-      setBookings(response.data.results || response.data);
+      // Tabs and totals are computed client-side, so load every page
+      setBookings(await fetchAllPages(bookingAPI.getDaycareBookings({ page_size: MAX_PAGE_SIZE })));
     } catch (error) {
       setError("Failed to load bookings. Please try again.");
       setBookings([]);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, Link } from "react-router-dom";
-import { bookingAPI } from "../services/api";
+import { bookingAPI, fetchAllPages, MAX_PAGE_SIZE } from "../services/api";
 import {
   Container,
   Row,
@@ -56,8 +56,8 @@ function ParentBookings() {
     try {
       setIsLoading(true);
       setError("");
-      const response = await bookingAPI.getBookings();
-      setBookings(response.data.results || response.data);
+      // Tabs filter client-side, so load every page
+      setBookings(await fetchAllPages(bookingAPI.getBookings({ page_size: MAX_PAGE_SIZE })));
     } catch (error) {
       console.error("Error fetching bookings:", error);
       setError("Failed to load bookings. Please try again.");
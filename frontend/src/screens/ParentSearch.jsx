@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, Link } from "react-router-dom";
 import parse from 'html-react-parser';
-import { bookingAPI } from "../services/api";
+import { bookingAPI, fetchNextPage } from "../services/api";
 import {
   Container,
   Row,
@@ -41,6 +41,9 @@ import "../styles/ParentSearch.css";
 function ParentSearch() {
   const navigate = useNavigate();
   const [daycares, setDaycares] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [totalCount, setTotalCount] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState("");
   const [searchTerm, setSearchTerm] = useState("");
@@ -85,15 +88,34 @@ function ParentSearch() {
 
       const response = await bookingAPI.searchDaycares(params);
       setDaycares(response.data.results || response.data);
+      setNextPage(response.data.next || null);
+      // The first page carries the facet block, whose total covers every page
+      setTotalCount(response.data.facets?.total ?? null);
     } catch (error) {
       console.error("Error fetching daycares:", error);
       setError("Failed to load daycares. Please try again.");
       setDaycares([]);
+      setNextPage(null);
+      setTotalCount(null);
     } finally {
       setIsLoading(false);
     }
   };
 
+  const loadMoreDaycares = async () => {
+    try {
+      setIsLoadingMore(true);
+      const response = await fetchNextPage(nextPage);
+      setDaycares(current => [...current, ...response.data.results]);
+      setNextPage(response.data.next || null);
+    } catch (error) {
+      console.error("Error fetching more daycares:", error);
+      setError("Failed to load more daycares. Please try again.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const renderStars = (rating) => {
     const stars = [];
     const fullStars = Math.floor(rating);
@@ -343,7 +365,7 @@ function ParentSearch() {
             )}
             <div className="results-summary">
               <h5>
-                Found {daycares.length} daycare{daycares.length !== 1 ? 's' : ''} 
+                Found {totalCount ?? daycares.length} daycare{(totalCount ?? daycares.length) !== 1 ? 's' : ''} 
                 {selectedArea && ` in ${areas.find(a => a.value === selectedArea)?.label}`}
               </h5>
             </div>
@@ -480,6 +502,16 @@ function ParentSearch() {
             </Col>
           )}
         </Row>
+
+        {nextPage && (
+          <Row className="mt-3">
+            <Col className="text-center">
+              <Button variant="outline-primary" onClick={loadMoreDaycares} disabled={isLoadingMore}>
+                {isLoadingMore ? "Loading..." : "Load more daycares"}
+              </Button>
+            </Col>
+          </Row>
+        )}
       </Container>
     </div>
   );
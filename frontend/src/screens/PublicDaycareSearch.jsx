@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, Link } from "react-router-dom";
-import { bookingAPI, publicAPI } from "../services/api";
+import { bookingAPI, publicAPI, fetchAllPages, MAX_PAGE_SIZE } from "../services/api";
 import {
   Container,
   Row,
@@ -109,9 +109,10 @@ function PublicDaycareSearch() {
 
   useEffect(() => {
     setIsLoading(true);
-    publicAPI.getVerifiedDaycares()
-      .then(response => {
-        setDaycares(response.data);
+    // Filters apply client-side, so load every page
+    fetchAllPages(publicAPI.getVerifiedDaycares({ page_size: MAX_PAGE_SIZE }))
+      .then(rows => {
+        setDaycares(rows);
         setIsLoading(false);
       })
       .catch(() => {
@@ -61,17 +61,37 @@ api.interceptors.response.use(
 );
 
 
+// List endpoints are cursor-paginated: { next, results }. Page size is capped server-side.
+export const MAX_PAGE_SIZE = 100;
+
+// Fetch a `next` link as returned by a list endpoint
+export const fetchNextPage = (next) => api.get(next);
+
+// Follow `next` links from the first page's request and return every row
+export const fetchAllPages = async (firstPage) => {
+  let response = await firstPage;
+  const rows = [...(response.data.results || response.data)];
+  while (response.data.next) {
+    response = await fetchNextPage(response.data.next);
+    rows.push(...response.data.results);
+  }
+  return rows;
+};
+
 // Booking API
 export const bookingAPI = {
   // Daycare search and discovery
   searchDaycares: (params) => api.get('/bookings/daycares/search/', { params }),
   getDaycareDetail: (id) => api.get(`/bookings/daycares/${id}/`),
+  getDaycaresBatch: (ids) => api.get('/bookings/daycares/batch/', { params: { ids: ids.join(',') } }),
+  autocompleteDaycares: (q, limit) => api.get('/bookings/daycares/autocomplete/', { params: { q, limit } }),
   getPopularDaycares: () => api.get('/bookings/daycares/popular/'),
   getNearbyDaycares: () => api.get('/bookings/daycares/nearby/'),
   
   // Booking management
   getBookings: (params) => api.get('/bookings/bookings/', { params }),
   createBooking: (bookingData) => api.post('/bookings/bookings/create/', bookingData),
+  createBookingsBulk: (bookings, mode = 'atomic') => api.post('/bookings/bookings/bulk-create/', { bookings, mode }),
   getBookingDetail: (id) => api.get(`/bookings/bookings/${id}/`),
   updateBooking: (id, bookingData) => api.put(`/bookings/bookings/${id}/update/`, bookingData),
   cancelBooking: (id, reason) => api.post(`bookings/daycare/cancel/${id}/`, {
@@ -89,7 +109,7 @@ export const bookingAPI = {
   getBookingHistorySummary: () => api.get('/bookings/history/summary/'),
 
   // Daycare Booking Management
-  getDaycareBookings: () => api.get('/bookings/daycare/bookings/'),
+  getDaycareBookings: (params) => api.get('/bookings/daycare/bookings/', { params }),
   updateDaycareBookingStatus: (id, status) => {
     if (status === 'completed') {
       return api.post(`/bookings/daycare/bookings/${id}/complete/`);
@@ -97,6 +117,7 @@ export const bookingAPI = {
     const action = status === 'Accepted' ? 'accept' : 'decline';
     return api.post(`/bookings/daycare/bookings/${id}/${action}/`);
   },
+  bulkUpdateDaycareBookings: (ids, action, reason = '') => api.post('/bookings/daycare/bookings/bulk/', { ids, action, reason }),
   getDaycareBookingHistory: () => api.get('/bookings/daycare/history/summary/'),
 };
 
@@ -131,7 +152,7 @@ export const userAPI = {
 };
 
 export const publicAPI = {
-  getVerifiedDaycares: () => api.get('/bookings/public/daycares/'),
+  getVerifiedDaycares: (params) => api.get('/bookings/public/daycares/', { params }),
 };
 
 export default api;
\ No newline at end of file